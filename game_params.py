@@ -1,3 +1,13 @@
 FIELD_ROW_DICT = {"1": 0, "2": 1, "3": 2, "4": 3, "5": 4, "6": 5, "7": 6, "8": 7}
 FIELD_COL_DICT = {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4, "f": 5, "g": 6, "h": 7}
 COLOR_DICT = {"white": 1, "black": -1}
+# color index used by the bitboard representation
+WHITE = 0
+BLACK = 1
+COLORS = ("white", "black")
+COLOR_INDEX = {"white": WHITE, "black": BLACK}
+# piece types; a piece code is color * 6 + piece type
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_VALUES = (1, 2.5, 3.5, 5, 9, 10)
+PIECE_SHORT_NAMES = ("p", "N", "B", "R", "Q", "K")
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
@@ -1,32 +1,33 @@
 from src.board import Board
-from game_setup import FIGURES, FIGURES_DICT
+from game_setup import create_figures
 
 if __name__ == '__main__':
-    board = Board(FIGURES)
+    figures, figures_dict = create_figures()
+    board = Board(figures)
     turn = "white"
     board.create_board()
     board.display_board()
     while True:
-        print("pieces: ", [name for name in FIGURES_DICT.keys()
-                           if FIGURES_DICT[name].value != 0
+        print("pieces: ", [name for name in figures_dict.keys()
+                           if figures_dict[name].value != 0
                            and name.startswith(turn[0])])
         figure_to_move = input(f"{turn} to move, chose piece to move from list above: ")
         if not figure_to_move.startswith(turn[0]):
             print("It is %s's turn. Please chose a %s piece to move." % (turn, turn))
         else:
-            if figure_to_move in FIGURES_DICT.keys():
+            if figure_to_move in figures_dict.keys():
                 if turn == "white":
                     next_turn = "black"
                 else:
                     next_turn = "white"
-                figure_to_move = FIGURES_DICT[figure_to_move]
+                figure_to_move = figures_dict[figure_to_move]
                 new_pos = input("Move to: ")
-                if figure_to_move.move_to(board, new_pos, turn):
+                move_done, reason = figure_to_move.move_to(board, new_pos, turn)
+                if move_done:
                     print(board.covered_squares)
-                    board.create_board()
                     board.display_board()
                     turn = next_turn
                 else:
-                    print("illegal move, chose another one.")
+                    print(f"{reason}, chose another one.")
             else:
                 print(f"{figure_to_move} not on Board")
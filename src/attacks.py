@@ -0,0 +1,108 @@
+"""
+Attack and ray tables, precomputed once at import time.
+Sliding pieces walk each ray only up to its first blocker: the ray from the
+piece is cut by xor-ing away the ray that starts behind the blocker.
+"""
+from src.bitboard import SQUARE_BB
+from game_params import PAWN, KNIGHT, BISHOP, ROOK, QUEEN
+
+# (row step, col step); the first four directions increase the square index
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1),
+              (-1, 0), (0, -1), (-1, -1), (-1, 1))
+# indices into DIRECTIONS of the rook moves, the others are the bishop moves
+ROOK_DIRECTIONS = (0, 1, 4, 5)
+KNIGHT_STEPS = ((2, 1), (1, 2), (-1, 2), (-2, 1),
+                (-2, -1), (-1, -2), (1, -2), (2, -1))
+
+
+def _squares_along(sq, d_row, d_col):
+    row, col = (sq >> 3) + d_row, (sq & 7) + d_col
+    while 0 <= row <= 7 and 0 <= col <= 7:
+        yield 8 * row + col
+        row, col = row + d_row, col + d_col
+
+
+def _step_attacks(sq, steps):
+    bb = 0
+    for d_row, d_col in steps:
+        row, col = (sq >> 3) + d_row, (sq & 7) + d_col
+        if 0 <= row <= 7 and 0 <= col <= 7:
+            bb |= SQUARE_BB[8 * row + col]
+    return bb
+
+
+def _ray(sq, d_row, d_col):
+    bb = 0
+    for target in _squares_along(sq, d_row, d_col):
+        bb |= SQUARE_BB[target]
+    return bb
+
+
+# RAYS[direction][square]: all squares from square (exclusive) to the board edge
+RAYS = tuple(tuple(_ray(sq, d_row, d_col) for sq in range(64))
+             for d_row, d_col in DIRECTIONS)
+KNIGHT_ATTACKS = tuple(_step_attacks(sq, KNIGHT_STEPS) for sq in range(64))
+KING_ATTACKS = tuple(_step_attacks(sq, DIRECTIONS) for sq in range(64))
+# PAWN_ATTACKS[color][square]: squares a pawn of that color on square attacks
+PAWN_ATTACKS = (tuple(_step_attacks(sq, ((1, 1), (1, -1))) for sq in range(64)),
+                tuple(_step_attacks(sq, ((-1, 1), (-1, -1))) for sq in range(64)))
+
+
+def _between(a, b):
+    for d_row, d_col in DIRECTIONS:
+        bb = 0
+        for target in _squares_along(a, d_row, d_col):
+            if target == b:
+                return bb
+            bb |= SQUARE_BB[target]
+    return 0
+
+
+# BETWEEN[a][b]: squares strictly between two squares on a common line, else 0
+BETWEEN = tuple(tuple(_between(a, b) for b in range(64)) for a in range(64))
+
+
+def ray_attacks(direction, sq, occupied):
+    """
+    squares attacked from sq along one direction, up to and including the first blocker
+    """
+    attacks = RAYS[direction][sq]
+    blockers = attacks & occupied
+    if blockers:
+        if direction < 4:
+            first = (blockers & -blockers).bit_length() - 1
+        else:
+            first = blockers.bit_length() - 1
+        attacks ^= RAYS[direction][first]
+    return attacks
+
+
+def bishop_attacks(sq, occupied):
+    return (ray_attacks(2, sq, occupied) | ray_attacks(3, sq, occupied)
+            | ray_attacks(6, sq, occupied) | ray_attacks(7, sq, occupied))
+
+
+def rook_attacks(sq, occupied):
+    return (ray_attacks(0, sq, occupied) | ray_attacks(1, sq, occupied)
+            | ray_attacks(4, sq, occupied) | ray_attacks(5, sq, occupied))
+
+
+def piece_attacks(piece_type, color, sq, occupied):
+    """
+    :param piece_type: PAWN, KNIGHT, BISHOP, ROOK, QUEEN or KING
+    :param color: color index, WHITE or BLACK
+    :param sq: square index of the piece
+    :param occupied: bitboard of all occupied squares
+    :return: bitboard of all squares attacked by the piece
+    """
+    if piece_type == PAWN:
+        return PAWN_ATTACKS[color][sq]
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if piece_type == BISHOP:
+        return bishop_attacks(sq, occupied)
+    if piece_type == ROOK:
+        return rook_attacks(sq, occupied)
+    if piece_type == QUEEN:
+        return bishop_attacks(sq, occupied) | rook_attacks(sq, occupied)
+    return KING_ATTACKS[sq]
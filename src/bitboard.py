@@ -0,0 +1,63 @@
+"""
+Helpers for the 64-bit bitboard position representation.
+Squares are numbered from 0 (a1) to 63 (h8): square = 8 * row + col, using the
+row and col numbering of FIELD_ROW_DICT and FIELD_COL_DICT.
+"""
+from game_params import FIELD_ROW_DICT, FIELD_COL_DICT
+
+FULL = 0xFFFFFFFFFFFFFFFF
+SQUARE_BB = tuple(1 << sq for sq in range(64))
+COL_NAMES = "abcdefgh"
+
+
+def square(row, col):
+    """
+    :param row: integer numbering the rows from 0 to 7
+    :param col: integer numbering the cols from 0 to 7
+    :return: square index from 0 to 63
+    """
+    return 8 * row + col
+
+
+def parse_square(field):
+    """
+    :param field: square in modern notation, e. g. "e4"
+    :return: square index from 0 to 63
+    """
+    return 8 * FIELD_ROW_DICT[field[1]] + FIELD_COL_DICT[field[0]]
+
+
+def square_name(sq):
+    """
+    :param sq: square index from 0 to 63
+    :return: square in modern notation, e. g. "e4"
+    """
+    return COL_NAMES[sq & 7] + str((sq >> 3) + 1)
+
+
+def popcount(bb):
+    return bb.bit_count()
+
+
+def lsb(bb):
+    """
+    :return: index of the least significant set bit of a non-empty bitboard
+    """
+    return (bb & -bb).bit_length() - 1
+
+
+def msb(bb):
+    """
+    :return: index of the most significant set bit of a non-empty bitboard
+    """
+    return bb.bit_length() - 1
+
+
+def iter_squares(bb):
+    """
+    yields the indices of all set bits, starting with the lowest square
+    """
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
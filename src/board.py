@@ -1,18 +1,566 @@
+import struct
 import numpy as np
-from src.figure import King, Pawn
+from src.figure import FIGURE_CLASSES
+from src.bitboard import SQUARE_BB, iter_squares, lsb, square_name, parse_square
+from src.attacks import PAWN_ATTACKS, KNIGHT_ATTACKS, KING_ATTACKS, BETWEEN, RAYS, ROOK_DIRECTIONS, \
+    piece_attacks, bishop_attacks, rook_attacks, ray_attacks
+from src.move import encode_move
+from src.zobrist import PIECE_KEYS, PAWN_KEYS, SIDE_KEY, CASTLING_KEYS, EP_KEYS, compute_key, \
+    compute_pawn_key
+from src.evaluation import MG_SCORES, EG_SCORES, PHASE, compute_scores
+from game_params import PIECE_VALUES, COLOR_INDEX, COLORS, WHITE, BLACK, \
+    PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+# castling rights bits
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+CASTLING_NAMES = (("K", WHITE_KINGSIDE), ("Q", WHITE_QUEENSIDE),
+                  ("k", BLACK_KINGSIDE), ("q", BLACK_QUEENSIDE))
+# castling rights kept when a piece moves from or to the square
+CASTLING_MASK = [15] * 64
+CASTLING_MASK[0] = 15 ^ WHITE_QUEENSIDE
+CASTLING_MASK[4] = 15 ^ (WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[7] = 15 ^ WHITE_KINGSIDE
+CASTLING_MASK[56] = 15 ^ BLACK_QUEENSIDE
+CASTLING_MASK[60] = 15 ^ (BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[63] = 15 ^ BLACK_KINGSIDE
+# king target square -> rook origin and target square
+CASTLING_ROOK_SQUARES = {6: (7, 5), 2: (0, 3), 62: (63, 61), 58: (56, 59)}
+# right, squares that must be empty, squares the king passes, king target square
+CASTLING_MOVES = ((WHITE_KINGSIDE, 0x60, (4, 5, 6), 6),
+                  (WHITE_QUEENSIDE, 0x0E, (4, 3, 2), 2),
+                  (BLACK_KINGSIDE, 0x60 << 56, (60, 61, 62), 62),
+                  (BLACK_QUEENSIDE, 0x0E << 56, (60, 59, 58), 58))
+PROMOTION_PIECE_TYPES = (QUEEN, ROOK, BISHOP, KNIGHT)
+# FEN letter per piece code
+FEN_PIECES = "PNBRQKpnbrqk"
+# mailbox entry of an empty square
+NO_PIECE = 12
+# packed position: occupancy, 4-bit piece codes of the occupied squares in square order,
+# side | castling << 1, en passant square, halfmove clock, fullmove number, padding
+PACKED_FORMAT = struct.Struct("<Q16sBBBH3x")
+PACKED_SIZE = PACKED_FORMAT.size
+NO_EP_SQUARE = 255
 
 
 class Board:
     def __init__(self, figures):
-        self.figures = figures
-        self.status = np.zeros((8, 8))
+        self._figures = figures
+        # one bitboard per piece code (color * 6 + piece type)
+        self.bitboards = [0] * 12
+        # occupancy per color index and of the whole board
+        self.occupancy = [0, 0]
+        self.occupied = 0
+        # mailbox: piece code on each square, NO_PIECE if empty
+        self.squares = bytearray([NO_PIECE] * 64)
+        self.side = WHITE
+        self.castling = 0
+        self.ep_square = None
+        # plies since the last capture or pawn move and number of the current full move
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        # undo records of the moves made with make_move
+        self.history = []
+        # attack_counts[color][square]: number of pieces of color attacking square
+        self.attack_counts = [bytearray(64), bytearray(64)]
         self.covered_squares = set()
         self.in_check = "None"
+        # 64-bit Zobrist key of the position, see src.zobrist
+        self.zobrist_key = 0
+        # key of the pawns and kings only, see src.zobrist
+        self.pawn_key = 0
+        # tapered evaluation terms kept up to date by the piece primitives, see src.evaluation
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        self.create_board()
+        self.castling = self._home_castling_rights()
+        self.zobrist_key = compute_key(self)
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Creates a board from a position in Forsyth-Edwards Notation
+        :param fen: FEN string, e. g. "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        :return: instance of class Board
+        """
+        fields = fen.split()
+        figures = []
+        for row_index, row in enumerate(fields[0].split("/")):
+            col = 0
+            for char in row:
+                if char.isdigit():
+                    col += int(char)
+                else:
+                    piece = FEN_PIECES.index(char)
+                    figures.append(FIGURE_CLASSES[piece % 6](square_name(8 * (7 - row_index) + col),
+                                                             COLORS[piece // 6]))
+                    col += 1
+        board = cls(figures)
+        board.side = WHITE if len(fields) < 2 or fields[1] == "w" else BLACK
+        board.castling = 0
+        if len(fields) > 2:
+            for name, right in CASTLING_NAMES:
+                if name in fields[2]:
+                    board.castling |= right
+            # keep only the rights whose king and rook stand on their initial squares
+            board.castling &= board._home_castling_rights()
+        if len(fields) > 3 and fields[3] != "-":
+            ep_square = parse_square(fields[3])
+            # like make_move, keep the square only if a pawn can capture en passant
+            if PAWN_ATTACKS[board.side ^ 1][ep_square] & board.bitboards[board.side * 6 + PAWN]:
+                board.ep_square = ep_square
+        if len(fields) > 5:
+            board.halfmove_clock = int(fields[4])
+            board.fullmove_number = int(fields[5])
+        board.zobrist_key = compute_key(board)
+        return board
+
+    def to_fen(self):
+        """
+        :return: the position in Forsyth-Edwards Notation
+        """
+        rows = []
+        for row in range(7, -1, -1):
+            text = ""
+            empty = 0
+            for sq in range(8 * row, 8 * row + 8):
+                piece = self.squares[sq]
+                if piece == NO_PIECE:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                text += FEN_PIECES[piece]
+            rows.append(text + str(empty) if empty else text)
+        castling = "".join(name for name, right in CASTLING_NAMES if self.castling & right) or "-"
+        ep_square = square_name(self.ep_square) if self.ep_square is not None else "-"
+        return f"{'/'.join(rows)} {'wb'[self.side]} {castling} {ep_square} " \
+               f"{self.halfmove_clock} {self.fullmove_number}"
+
+    def pack(self):
+        """
+        Encodes the position in PACKED_SIZE (32) bytes, see PACKED_FORMAT. The move
+        history is not part of the encoding, positions with more than 32 pieces cannot
+        be encoded.
+        :return: bytes
+        """
+        if self.occupied.bit_count() > 32:
+            raise ValueError("cannot pack a position with more than 32 pieces")
+        codes = bytearray(16)
+        for index, sq in enumerate(iter_squares(self.occupied)):
+            codes[index >> 1] |= self.squares[sq] << (4 * (index & 1))
+        return PACKED_FORMAT.pack(self.occupied, bytes(codes), self.side | self.castling << 1,
+                                  NO_EP_SQUARE if self.ep_square is None else self.ep_square,
+                                  min(self.halfmove_clock, 255), self.fullmove_number)
+
+    @classmethod
+    def unpack(cls, data):
+        """
+        Creates a board from a position encoded with pack
+        :param data: bytes-like object of PACKED_SIZE bytes
+        :return: instance of class Board
+        """
+        occupied, codes, flags, ep_square, halfmove_clock, fullmove_number = \
+            PACKED_FORMAT.unpack(data)
+        board = cls([])
+        for index, sq in enumerate(iter_squares(occupied)):
+            board.bitboards[(codes[index >> 1] >> (4 * (index & 1))) & 15] |= SQUARE_BB[sq]
+        board._figures = None
+        board._rebuild()
+        board.side = flags & 1
+        board.castling = flags >> 1
+        board.ep_square = None if ep_square == NO_EP_SQUARE else ep_square
+        board.halfmove_clock = halfmove_clock
+        board.fullmove_number = fullmove_number
+        board.zobrist_key = compute_key(board)
+        return board
+
+    def copy(self):
+        """
+        :return: independent copy of the board including its move history. The copy
+                 builds its own figures from the bitboards when they are accessed.
+        """
+        board = Board.__new__(Board)
+        board._figures = None
+        board.bitboards = self.bitboards[:]
+        board.occupancy = self.occupancy[:]
+        board.occupied = self.occupied
+        board.squares = self.squares[:]
+        board.side = self.side
+        board.castling = self.castling
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        board.history = self.history[:]
+        board.attack_counts = [self.attack_counts[0][:], self.attack_counts[1][:]]
+        board.covered_squares = set(self.covered_squares)
+        board.in_check = self.in_check
+        board.zobrist_key = self.zobrist_key
+        board.pawn_key = self.pawn_key
+        board.mg_score = self.mg_score
+        board.eg_score = self.eg_score
+        board.phase = self.phase
+        return board
+
+    def _home_castling_rights(self):
+        """
+        :return: castling rights for all kings and rooks standing on their initial squares
+        """
+        rights = 0
+        for right, king, rook in ((WHITE_KINGSIDE, WHITE * 6 + KING, 7),
+                                  (WHITE_QUEENSIDE, WHITE * 6 + KING, 0),
+                                  (BLACK_KINGSIDE, BLACK * 6 + KING, 63),
+                                  (BLACK_QUEENSIDE, BLACK * 6 + KING, 56)):
+            king_sq = 4 if king < 6 else 60
+            if self.bitboards[king] & SQUARE_BB[king_sq] and self.bitboards[king - KING + ROOK] & SQUARE_BB[rook]:
+                rights |= right
+        return rights
+
+    @property
+    def figures(self):
+        """
+        list of figures on the board. After make_move or unmake_move the list is
+        rebuilt from the bitboards on first access.
+        """
+        if self._figures is None:
+            self._figures = [FIGURE_CLASSES[piece % 6](square_name(sq), COLORS[piece // 6])
+                             for piece, bb in enumerate(self.bitboards)
+                             for sq in iter_squares(bb)]
+        return self._figures
+
+    @figures.setter
+    def figures(self, figures):
+        self._figures = figures
+
+    @property
+    def turn(self):
+        """
+        side to move, "white" or "black"
+        """
+        return COLORS[self.side]
 
     def create_board(self):
-        self.status = np.zeros((8, 8))
+        """
+        rebuilds the bitboards, mailbox and attack counts from the list of figures
+        """
+        self.bitboards = [0] * 12
         for figure in self.figures:
-            self.status[figure.field_row, figure.field_col] = figure.value
+            self.bitboards[figure.color_index * 6 + figure.piece_type] |= SQUARE_BB[figure.square]
+        self._rebuild()
+
+    def _rebuild(self):
+        """
+        derives occupancy, mailbox, attack counts, keys and evaluation terms from the bitboards
+        """
+        self.occupancy = [0, 0]
+        self.squares = bytearray([NO_PIECE] * 64)
+        for piece, bb in enumerate(self.bitboards):
+            self.occupancy[piece // 6] |= bb
+            for sq in iter_squares(bb):
+                self.squares[sq] = piece
+        self.occupied = self.occupancy[0] | self.occupancy[1]
+        self.attack_counts = [bytearray(64), bytearray(64)]
+        for piece, bb in enumerate(self.bitboards):
+            for sq in iter_squares(bb):
+                self._update_attacks(piece, sq, 1)
+        self.zobrist_key = compute_key(self)
+        self.pawn_key = compute_pawn_key(self)
+        self.mg_score, self.eg_score, self.phase = compute_scores(self)
+
+    def piece_at(self, sq):
+        """
+        :param sq: square index from 0 to 63
+        :return: piece code (color * 6 + piece type) on the square, None if empty
+        """
+        piece = self.squares[sq]
+        return None if piece == NO_PIECE else piece
+
+    def _update_attacks(self, piece, sq, sign):
+        """
+        adds (sign 1) or subtracts (sign -1) the attacks of a piece on sq to the attack counts
+        """
+        counts = self.attack_counts[piece // 6]
+        for target in iter_squares(piece_attacks(piece % 6, piece // 6, sq, self.occupied)):
+            counts[target] += sign
+
+    def _update_rays_through(self, sq, sign):
+        """
+        updates the attack counts of the sliding pieces whose rays reach sq: when sq is
+        vacated (sign 1) they attack the squares behind it, when sq gets occupied
+        (sign -1) these squares are blocked
+        """
+        occupied = self.occupied
+        for direction in range(8):
+            blockers = RAYS[direction][sq] & occupied
+            if not blockers:
+                continue
+            if direction < 4:
+                slider_sq = (blockers & -blockers).bit_length() - 1
+            else:
+                slider_sq = blockers.bit_length() - 1
+            piece = self.squares[slider_sq]
+            piece_type = piece % 6
+            if piece_type == QUEEN or piece_type == (ROOK if direction in ROOK_DIRECTIONS else BISHOP):
+                counts = self.attack_counts[piece // 6]
+                for target in iter_squares(ray_attacks(direction ^ 4, sq, occupied)):
+                    counts[target] += sign
+
+    def _remove_piece(self, piece, sq):
+        self._update_attacks(piece, sq, -1)
+        bb = SQUARE_BB[sq]
+        self.bitboards[piece] ^= bb
+        self.occupancy[piece // 6] ^= bb
+        self.occupied ^= bb
+        self.squares[sq] = NO_PIECE
+        self.zobrist_key ^= PIECE_KEYS[piece][sq]
+        self.pawn_key ^= PAWN_KEYS[piece][sq]
+        self.mg_score -= MG_SCORES[piece][sq]
+        self.eg_score -= EG_SCORES[piece][sq]
+        self.phase -= PHASE[piece]
+        self._update_rays_through(sq, 1)
+
+    def _place_piece(self, piece, sq):
+        self._update_rays_through(sq, -1)
+        bb = SQUARE_BB[sq]
+        self.bitboards[piece] ^= bb
+        self.occupancy[piece // 6] ^= bb
+        self.occupied ^= bb
+        self.squares[sq] = piece
+        self.zobrist_key ^= PIECE_KEYS[piece][sq]
+        self.pawn_key ^= PAWN_KEYS[piece][sq]
+        self.mg_score += MG_SCORES[piece][sq]
+        self.eg_score += EG_SCORES[piece][sq]
+        self.phase += PHASE[piece]
+        self._update_attacks(piece, sq, 1)
+
+    def _replace_piece(self, old_piece, new_piece, sq):
+        """
+        exchanges the piece on an occupied square, no ray through sq changes
+        """
+        self._update_attacks(old_piece, sq, -1)
+        bb = SQUARE_BB[sq]
+        self.bitboards[old_piece] ^= bb
+        self.occupancy[old_piece // 6] ^= bb
+        self.bitboards[new_piece] ^= bb
+        self.occupancy[new_piece // 6] ^= bb
+        self.squares[sq] = new_piece
+        self.zobrist_key ^= PIECE_KEYS[old_piece][sq] ^ PIECE_KEYS[new_piece][sq]
+        self.pawn_key ^= PAWN_KEYS[old_piece][sq] ^ PAWN_KEYS[new_piece][sq]
+        self.mg_score += MG_SCORES[new_piece][sq] - MG_SCORES[old_piece][sq]
+        self.eg_score += EG_SCORES[new_piece][sq] - EG_SCORES[old_piece][sq]
+        self.phase += PHASE[new_piece] - PHASE[old_piece]
+        self._update_attacks(new_piece, sq, 1)
+
+    def make_move(self, move):
+        """
+        Carries out a move of the side to move without checking its legality and
+        pushes an undo record, so that the move can be taken back with unmake_move.
+        :param move: move as integer, see src.move
+        """
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        promotion = move >> 12
+        piece = self.squares[from_sq]
+        piece_type = piece % 6
+        if piece_type == PAWN and to_sq == self.ep_square:
+            captured_sq = to_sq ^ 8
+        else:
+            captured_sq = to_sq
+        captured = self.squares[captured_sq]
+        self.history.append((move, piece, captured, self.castling, self.ep_square, self.in_check,
+                             self.zobrist_key, self.halfmove_clock))
+        self._remove_piece(piece, from_sq)
+        new_piece = piece - piece_type + promotion if promotion else piece
+        if captured == NO_PIECE:
+            self._place_piece(new_piece, to_sq)
+        elif captured_sq == to_sq:
+            self._replace_piece(captured, new_piece, to_sq)
+        else:
+            self._remove_piece(captured, captured_sq)
+            self._place_piece(new_piece, to_sq)
+        if piece_type == KING and (to_sq - from_sq == 2 or from_sq - to_sq == 2):
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+            self._remove_piece(piece - KING + ROOK, rook_from)
+            self._place_piece(piece - KING + ROOK, rook_to)
+        key = self.zobrist_key ^ CASTLING_KEYS[self.castling] ^ SIDE_KEY
+        self.castling &= CASTLING_MASK[from_sq] & CASTLING_MASK[to_sq]
+        key ^= CASTLING_KEYS[self.castling]
+        if self.ep_square is not None:
+            key ^= EP_KEYS[self.ep_square & 7]
+        self.ep_square = None
+        if piece_type == PAWN and (to_sq - from_sq == 16 or from_sq - to_sq == 16):
+            # the en passant square is only set if an enemy pawn can capture on it
+            ep_square = (from_sq + to_sq) >> 1
+            if PAWN_ATTACKS[piece // 6][ep_square] & self.bitboards[(piece // 6 ^ 1) * 6 + PAWN]:
+                self.ep_square = ep_square
+                key ^= EP_KEYS[ep_square & 7]
+        self.zobrist_key = key
+        self.halfmove_clock = 0 if piece_type == PAWN or captured != NO_PIECE else self.halfmove_clock + 1
+        self.fullmove_number += self.side
+        self.side ^= 1
+        self._figures = None
+
+    def unmake_move(self):
+        """
+        Takes back the last move carried out with make_move
+        """
+        move, piece, captured, self.castling, self.ep_square, self.in_check, key, \
+            self.halfmove_clock = self.history.pop()
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        promotion = move >> 12
+        piece_type = piece % 6
+        if piece_type == KING and (to_sq - from_sq == 2 or from_sq - to_sq == 2):
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+            self._remove_piece(piece - KING + ROOK, rook_to)
+            self._place_piece(piece - KING + ROOK, rook_from)
+        new_piece = piece - piece_type + promotion if promotion else piece
+        if captured == NO_PIECE:
+            self._remove_piece(new_piece, to_sq)
+        elif piece_type == PAWN and to_sq == self.ep_square:
+            self._remove_piece(new_piece, to_sq)
+            self._place_piece(captured, to_sq ^ 8)
+        else:
+            self._replace_piece(new_piece, captured, to_sq)
+        self._place_piece(piece, from_sq)
+        self.zobrist_key = key
+        self.side ^= 1
+        self.fullmove_number -= self.side
+        self._figures = None
+
+    def repetition_count(self):
+        """
+        :return: number of earlier occurrences of the current position in the move history
+        """
+        key = self.zobrist_key
+        # positions before the last capture or pawn move cannot occur again
+        return sum(1 for record in self.history[-2:-self.halfmove_clock - 1:-2] if record[6] == key)
+
+    def _attackers(self, sq, color, occupied):
+        """
+        :param sq: square index
+        :param color: color index of the attacking side
+        :param occupied: occupancy used for the sliding pieces
+        :return: bitboard of the pieces of color attacking sq
+        """
+        bitboards = self.bitboards
+        base = color * 6
+        queens = bitboards[base + QUEEN]
+        return ((PAWN_ATTACKS[color ^ 1][sq] & bitboards[base + PAWN])
+                | (KNIGHT_ATTACKS[sq] & bitboards[base + KNIGHT])
+                | (KING_ATTACKS[sq] & bitboards[base + KING])
+                | (bishop_attacks(sq, occupied) & (bitboards[base + BISHOP] | queens))
+                | (rook_attacks(sq, occupied) & (bitboards[base + ROOK] | queens)))
+
+    def _pins(self, us, king_sq):
+        """
+        :return: dict from the square of each piece of us pinned to its king to the
+                 bitboard of squares it may still move to along the pin
+        """
+        them = us ^ 1
+        bitboards = self.bitboards
+        queens = bitboards[them * 6 + QUEEN]
+        snipers = ((bishop_attacks(king_sq, 0) & (bitboards[them * 6 + BISHOP] | queens))
+                   | (rook_attacks(king_sq, 0) & (bitboards[them * 6 + ROOK] | queens)))
+        pins = {}
+        for sniper in iter_squares(snipers):
+            between = BETWEEN[king_sq][sniper] & self.occupied
+            if between and not between & (between - 1) and between & self.occupancy[us]:
+                pins[lsb(between)] = BETWEEN[king_sq][sniper] | SQUARE_BB[sniper]
+        return pins
+
+    def generate_legal_moves(self, color=None):
+        """
+        Generates all strictly legal moves of a side in one pass. Checking pieces and
+        pinned pieces are determined up front, so no move has to be tried on the board.
+        :param color: "white" or "black", defaults to the side to move
+        :return: list of moves as integers, see src.move
+        """
+        us = self.side if color is None else COLOR_INDEX[color]
+        them = us ^ 1
+        bitboards = self.bitboards
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupied = self.occupied
+        moves = []
+        king = bitboards[us * 6 + KING]
+        if not king:
+            return moves
+        king_sq = lsb(king)
+
+        # king moves: the king itself must not block the rays of the attacking sliders
+        occupied_without_king = occupied ^ king
+        for to_sq in iter_squares(KING_ATTACKS[king_sq] & ~own):
+            if not self._attackers(to_sq, them, occupied_without_king):
+                moves.append(encode_move(king_sq, to_sq))
+
+        checkers = self._attackers(king_sq, them, occupied)
+        if checkers & (checkers - 1):
+            return moves
+        if checkers:
+            target_mask = checkers | BETWEEN[king_sq][lsb(checkers)]
+        else:
+            target_mask = ~own
+            if self.castling:
+                counts = self.attack_counts[them]
+                for right, empty, king_path, to_sq in CASTLING_MOVES[2 * us:2 * us + 2]:
+                    if self.castling & right and not occupied & empty \
+                            and not any(counts[sq] for sq in king_path):
+                        moves.append(encode_move(king_sq, to_sq))
+        pins = self._pins(us, king_sq)
+
+        for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for from_sq in iter_squares(bitboards[us * 6 + piece_type]):
+                targets = piece_attacks(piece_type, us, from_sq, occupied) & ~own & target_mask
+                if from_sq in pins:
+                    targets &= pins[from_sq]
+                for to_sq in iter_squares(targets):
+                    moves.append(encode_move(from_sq, to_sq))
+
+        step = 8 if us == WHITE else -8
+        start_row = 1 if us == WHITE else 6
+        for from_sq in iter_squares(bitboards[us * 6 + PAWN]):
+            targets = PAWN_ATTACKS[us][from_sq] & enemy
+            push_sq = from_sq + step
+            if 0 <= push_sq < 64 and not occupied & SQUARE_BB[push_sq]:
+                targets |= SQUARE_BB[push_sq]
+                if from_sq >> 3 == start_row and not occupied & SQUARE_BB[push_sq + step]:
+                    targets |= SQUARE_BB[push_sq + step]
+            targets &= target_mask
+            if from_sq in pins:
+                targets &= pins[from_sq]
+            for to_sq in iter_squares(targets):
+                if to_sq >> 3 == 7 or to_sq >> 3 == 0:
+                    for promotion in PROMOTION_PIECE_TYPES:
+                        moves.append(encode_move(from_sq, to_sq, promotion))
+                else:
+                    moves.append(encode_move(from_sq, to_sq))
+
+        # the en passant square only belongs to the side to move
+        if self.ep_square is not None and us == self.side:
+            captured_bb = SQUARE_BB[self.ep_square ^ 8]
+            for from_sq in iter_squares(PAWN_ATTACKS[them][self.ep_square] & bitboards[us * 6 + PAWN]):
+                # both pawns leave their rows at once, so test the king on the resulting board
+                occupied_after = occupied ^ SQUARE_BB[from_sq] ^ captured_bb | SQUARE_BB[self.ep_square]
+                if not self._attackers(king_sq, them, occupied_after) & ~captured_bb:
+                    moves.append(encode_move(from_sq, self.ep_square))
+        return moves
+
+    @property
+    def status(self):
+        """
+        8x8 array with the signed value of the piece on each square
+        """
+        status = np.zeros((8, 8))
+        for piece, bb in enumerate(self.bitboards):
+            value = PIECE_VALUES[piece % 6] * (1 if piece < 6 else -1)
+            for sq in iter_squares(bb):
+                status[sq >> 3, sq & 7] = value
+        return status
 
     def display_board(self):
         display = ""
@@ -29,31 +577,71 @@ class Board:
         print(display)
         return display
 
+    def is_covered(self, row, col, color):
+        """
+        :param row: integer numbering the rows from 0 to 7
+        :param col: integer numbering the cols from 0 to 7
+        :param color: "white" or "black"
+        :return: True, if a piece of color attacks the square and no piece of color
+                 stands on it
+        """
+        color_index = COLOR_INDEX[color]
+        sq = 8 * row + col
+        return (self.attack_counts[color_index][sq] > 0
+                and not self.occupancy[color_index] & SQUARE_BB[sq])
+
     def get_covered_squares(self, color):
-        for figure in self.figures:
-            if figure.color == color:
-                if not isinstance(figure, Pawn):
-                    figure.get_legal_moves(self)
-                    for move in figure.legal_moves | figure.legal_capture_moves:
-                        self.covered_squares.add((figure.field_row + move[0],
-                                                  figure.field_col + move[1]))
-                else:
-                    for move in figure.pot_capture_moves:
-                        target_row = figure.field_row + move[0]
-                        target_col = figure.field_col + move[1]
-                        if not (target_row > 7 or target_row < 0
-                                or target_col > 7 or target_col < 0):
-                            self.covered_squares.add((target_row, target_col))
+        """
+        sets covered_squares to all squares attacked by the pieces of color on which
+        no piece of color stands
+        :param color: "white" or "black"
+        """
+        color_index = COLOR_INDEX[color]
+        counts = self.attack_counts[color_index]
+        own = self.occupancy[color_index]
+        self.covered_squares = {(sq >> 3, sq & 7) for sq in range(64)
+                                if counts[sq] and not own & SQUARE_BB[sq]}
+
+    def is_square_attacked(self, square, by_color):
+        """
+        Looks outward from the square for pawn, knight, king and slider attackers and
+        stops at the first one found
+        :param square: square index from 0 to 63 or name in modern notation, e. g. "e4"
+        :param by_color: "white" or "black"
+        :return: True, if a piece of by_color attacks the square
+        """
+        sq = parse_square(square) if isinstance(square, str) else square
+        color_index = COLOR_INDEX[by_color]
+        bitboards = self.bitboards
+        base = color_index * 6
+        if PAWN_ATTACKS[color_index ^ 1][sq] & bitboards[base + PAWN] \
+                or KNIGHT_ATTACKS[sq] & bitboards[base + KNIGHT] \
+                or KING_ATTACKS[sq] & bitboards[base + KING]:
+            return True
+        queens = bitboards[base + QUEEN]
+        bishops = bitboards[base + BISHOP] | queens
+        if bishops and bishop_attacks(sq, self.occupied) & bishops:
+            return True
+        rooks = bitboards[base + ROOK] | queens
+        return bool(rooks and rook_attacks(sq, self.occupied) & rooks)
+
+    def is_in_check(self, color):
+        """
+        :param color: "white" or "black"
+        :return: True, if the king of color is attacked
+        """
+        king = self.bitboards[COLOR_INDEX[color] * 6 + KING]
+        return bool(king) and self.is_square_attacked(lsb(king), COLORS[COLOR_INDEX[color] ^ 1])
 
     def king_in_check(self, color):
-        if color == "white":
-            op_color = "black"
-        else:
-            op_color = "white"
-        self.get_covered_squares(op_color)
-        for figure in self.figures:
-            if figure.color != op_color and isinstance(figure, King):
-                if (figure.field_row, figure.field_col) in self.covered_squares:
-                    self.in_check = color
-                else:
-                    self.in_check = "None"
+        """
+        sets in_check to color, if the king of color is attacked, otherwise to "None"
+        :param color: "white" or "black"
+        """
+        color_index = COLOR_INDEX[color]
+        king = self.bitboards[color_index * 6 + KING]
+        if king:
+            if self.is_in_check(color):
+                self.in_check = color
+            else:
+                self.in_check = "None"
@@ -0,0 +1,223 @@
+"""
+Opening book: a binary file of fixed-size records (Zobrist key, move, weight)
+sorted by key, see src.zobrist for the keys. The builder counts the moves played
+in the openings of PGN games or self-play shards, a move weighs two per win and
+one per draw of the side that played it. The reader memory-maps the file and
+finds the moves of a position by binary search, so the book is never loaded
+into memory.
+Usage:
+    python -m src.book book.bin --pgn games.pgn --selfplay data/selfplay [--max-plies 20]
+"""
+import argparse
+import mmap
+import numbers
+import os
+import random
+import struct
+import time
+from collections import defaultdict
+import numpy as np
+from src.board import Board
+from src.dataset import ShardedDataset
+from src.pgn import read_pgn_file, replay
+
+# key, move, weight
+BOOK_RECORD = struct.Struct("<QHI")
+BOOK_DTYPE = np.dtype([("key", "<u8"), ("move", "<u2"), ("weight", "<u4")])
+BOOK_RECORD_SIZE = BOOK_RECORD.size
+# number of plies from the start of a game that are put into the book
+BOOK_PLIES = 20
+# weight of a move per win and per draw of the side that played it
+WIN_WEIGHT = 2
+DRAW_WEIGHT = 1
+# packed positions, see Board.pack: byte of the side to move and bytes of the fullmove number
+SIDE_BYTE = 24
+FULLMOVE_BYTES = (27, 28)
+PGN_RESULTS = {"1-0": 1, "0-1": -1, "1/2-1/2": 0}
+
+
+class BookBuilder:
+    def __init__(self, max_plies=BOOK_PLIES):
+        """
+        :param max_plies: number of plies of each game that are counted
+        """
+        self.max_plies = max_plies
+        self.weights = defaultdict(int)
+        self.games = 0
+
+    def add(self, key, move, result):
+        """
+        counts one move played in a position
+        :param key: Zobrist key of the position
+        :param move: move as integer
+        :param result: result of the game for the side that played the move, 1, 0 or -1
+        """
+        weight = WIN_WEIGHT if result > 0 else DRAW_WEIGHT if result == 0 else 0
+        # a move that only lost keeps weight 0 and is left out by write
+        self.weights[key, move] += weight
+
+    def add_game(self, game):
+        """
+        :param game: Game tuple of src.pgn, games without a decisive result or draw are skipped
+        :return: True, if the game was counted
+        :raises ValueError: for an illegal move (PgnError) or FEN header, nothing is counted then
+        """
+        result = PGN_RESULTS.get(game.result)
+        if result is None:
+            return False
+        # the moves are only counted once the whole prefix has been parsed
+        played = []
+        for ply, (board, move) in enumerate(replay(game)):
+            if ply == self.max_plies:
+                break
+            played.append((board.zobrist_key, move, -result if board.side else result))
+        for key, move, side_result in played:
+            self.add(key, move, side_result)
+        self.games += 1
+        return True
+
+    def add_pgn(self, path):
+        """
+        counts the games of a PGN file, games with illegal moves or FEN headers are skipped
+        :return: number of games counted
+        """
+        games = 0
+        for game in read_pgn_file(path):
+            try:
+                games += self.add_game(game)
+            except ValueError:
+                # PgnError for an illegal move, ValueError of Board.from_fen for a bad FEN
+                pass
+        return games
+
+    def add_records(self, records):
+        """
+        :param records: array of RECORD_DTYPE of src.dataset, e. g. from self-play
+        :return: number of records counted
+        """
+        positions = records["position"]
+        fullmove = (positions[:, FULLMOVE_BYTES[0]].astype(np.int64)
+                    | (positions[:, FULLMOVE_BYTES[1]].astype(np.int64) << 8))
+        plies = 2 * (fullmove - 1) + (positions[:, SIDE_BYTE] & 1)
+        selected = np.flatnonzero(plies < self.max_plies)
+        for index in selected:
+            record = records[index]
+            board = Board.unpack(record["position"].tobytes())
+            self.add(board.zobrist_key, int(record["move"]), int(record["result"]))
+        self.games += int(np.count_nonzero(plies == 0))
+        return len(selected)
+
+    def add_dataset(self, directory):
+        """
+        counts the records of a directory of shards written by src.selfplay
+        :return: number of records counted
+        """
+        return sum(self.add_records(shard) for shard in ShardedDataset(directory).shards)
+
+    def write(self, path, min_weight=1):
+        """
+        writes the book sorted by key, the moves of a position by decreasing weight
+        :param min_weight: moves with a smaller total weight are left out
+        :return: number of records written
+        """
+        entries = np.array([(key, move, weight) for (key, move), weight in self.weights.items()
+                            if weight >= min_weight], dtype=BOOK_DTYPE)
+        entries = entries[np.lexsort((entries["move"], -entries["weight"].astype(np.int64),
+                                      entries["key"]))]
+        entries.tofile(path)
+        return len(entries)
+
+
+class OpeningBook:
+    def __init__(self, path):
+        """
+        :param path: book file written by BookBuilder
+        """
+        size = os.path.getsize(path)
+        if size % BOOK_RECORD_SIZE:
+            raise ValueError(f"{path}: {size} bytes is no multiple of the record size {BOOK_RECORD_SIZE}")
+        self.path = path
+        self.size = size // BOOK_RECORD_SIZE
+        self._file = open(path, "rb")
+        # an empty file cannot be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return self.size
+
+    def _key_at(self, index):
+        return BOOK_RECORD.unpack_from(self._map, index * BOOK_RECORD_SIZE)[0]
+
+    def entries(self, board):
+        """
+        :param board: instance of class Board or Zobrist key of a position
+        :return: list of (move, weight) of the position by decreasing weight, empty if unknown
+        """
+        key = int(board) if isinstance(board, numbers.Integral) else board.zobrist_key
+        # first record with a key not less than key
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        while low < self.size:
+            record_key, move, weight = BOOK_RECORD.unpack_from(self._map, low * BOOK_RECORD_SIZE)
+            if record_key != key:
+                break
+            entries.append((move, weight))
+            low += 1
+        return entries
+
+    def __contains__(self, board):
+        return bool(self.entries(board))
+
+    def choose(self, board, rng=None):
+        """
+        :param board: instance of class Board
+        :param rng: optional instance of random.Random
+        :return: a book move chosen with probability proportional to its weight, None if the
+                 position has no move of positive weight in the book
+        """
+        entries = [(move, weight) for move, weight in self.entries(board) if weight]
+        if not entries:
+            return None
+        moves, weights = zip(*entries)
+        return (rng or random).choices(moves, weights=weights)[0]
+
+    def close(self):
+        if self.size:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="build an opening book from games")
+    parser.add_argument("path", help="output book file")
+    parser.add_argument("--pgn", nargs="*", default=[], help="PGN files")
+    parser.add_argument("--selfplay", nargs="*", default=[], help="directories of self-play shards")
+    parser.add_argument("--max-plies", type=int, default=BOOK_PLIES)
+    parser.add_argument("--min-weight", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    builder = BookBuilder(args.max_plies)
+    start = time.perf_counter()
+    for path in args.pgn:
+        builder.add_pgn(path)
+    for directory in args.selfplay:
+        builder.add_dataset(directory)
+    records = builder.write(args.path, args.min_weight)
+    print(f"games {builder.games}  moves {records}  time {time.perf_counter() - start:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
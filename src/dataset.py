@@ -0,0 +1,218 @@
+"""
+On-disk format of training positions. Each record is RECORD_SIZE bytes: the
+position packed with Board.pack, the move played in it (see src.move) and the
+result of the game from the point of view of the side to move (1 win, 0 draw,
+-1 loss). Records are appended to shard files of a fixed maximum size; the
+index file of the directory lists the shards with their number of records.
+ShardedDataset memory-maps the shards and reads records as numpy arrays.
+"""
+import os
+import json
+import numpy as np
+from src.board import PACKED_SIZE
+from src.features import encode_packed
+
+RECORD_DTYPE = np.dtype([("position", np.uint8, (PACKED_SIZE,)), ("move", "<u2"), ("result", "i1")])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+SHARD_SUFFIX = ".bin"
+INDEX_NAME = "index.json"
+
+
+class ShardWriter:
+    def __init__(self, directory, records_per_shard=1 << 20, prefix="shard"):
+        """
+        :param directory: directory of the shard files, created if missing
+        :param records_per_shard: number of records after which a new shard is started
+        :param prefix: file name prefix of the shards
+        """
+        self.directory = directory
+        self.records_per_shard = records_per_shard
+        self.prefix = prefix
+        os.makedirs(directory, exist_ok=True)
+        self.shards = []
+        self.records = 0
+        self._file = None
+        self._shard_records = 0
+
+    def write(self, records):
+        """
+        appends records to the current shard, starting new shards when they are full
+        :param records: array of RECORD_DTYPE
+        """
+        start = 0
+        while start < len(records):
+            if self._file is None or self._shard_records == self.records_per_shard:
+                self._open_shard()
+            count = min(len(records) - start, self.records_per_shard - self._shard_records)
+            self._file.write(records[start:start + count].tobytes())
+            self._shard_records += count
+            self.records += count
+            start += count
+
+    def _open_shard(self):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.shards):05d}{SHARD_SUFFIX}")
+        self._file = open(path, "wb")
+        self.shards.append(path)
+        self._shard_records = 0
+
+    def close(self):
+        """
+        closes the current shard and writes the index of the shards of this writer
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        # shards of earlier runs into the same directory are not listed
+        write_index(self.directory, [os.path.basename(path) for path in self.shards])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_index(directory, names=None):
+    """
+    writes the index of shards in directory
+    :param names: file names of the shards, defaults to all shards in directory sorted by name
+    :return: list of (file name, number of records)
+    """
+    if names is None:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(SHARD_SUFFIX))
+    shards = [(name, os.path.getsize(os.path.join(directory, name)) // RECORD_SIZE) for name in names]
+    with open(os.path.join(directory, INDEX_NAME), "w") as file:
+        json.dump({"record_size": RECORD_SIZE,
+                   "shards": [{"name": name, "records": records} for name, records in shards]},
+                  file, indent=2)
+    return shards
+
+
+class ShardedDataset:
+    def __init__(self, directory):
+        """
+        :param directory: directory with shards and index written by ShardWriter
+        """
+        with open(os.path.join(directory, INDEX_NAME)) as file:
+            index = json.load(file)
+        if index["record_size"] != RECORD_SIZE:
+            raise ValueError(f"records of {index['record_size']} bytes, expected {RECORD_SIZE}")
+        self.shards = [np.memmap(os.path.join(directory, shard["name"]), dtype=RECORD_DTYPE, mode="r",
+                                 shape=(shard["records"],))
+                       for shard in index["shards"] if shard["records"]]
+        # offsets[i]: index of the first record of shard i, offsets[-1]: number of records
+        self.offsets = np.zeros(len(self.shards) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(shard) for shard in self.shards])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, index):
+        """
+        :param index: record index or array of record indices
+        :return: record or array of RECORD_DTYPE
+        """
+        if np.ndim(index):
+            return self.take(index)
+        if index < 0:
+            index += len(self)
+        shard = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        return self.shards[shard][index - self.offsets[shard]]
+
+    def take(self, indices):
+        """
+        :param indices: array of record indices
+        :return: array of RECORD_DTYPE with the records in the order of indices
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < -len(self) or indices.max() >= len(self)):
+            raise IndexError(f"record index out of range for {len(self)} records")
+        # negative indices count from the end as in __getitem__
+        indices = indices % len(self) if len(self) else indices
+        records = np.empty(len(indices), dtype=RECORD_DTYPE)
+        shards = np.searchsorted(self.offsets, indices, side="right") - 1
+        for shard in np.unique(shards):
+            selected = shards == shard
+            records[selected] = self.shards[shard][indices[selected] - self.offsets[shard]]
+        return records
+
+    def sample(self, batch_size, rng=None):
+        """
+        :param rng: optional numpy Generator
+        :return: array of batch_size records drawn uniformly at random
+        """
+        rng = rng or np.random.default_rng()
+        return self.take(rng.integers(0, len(self), batch_size))
+
+    def batches(self, batch_size, shuffle_buffer=0, seed=None, drop_last=False, encode=False):
+        """
+        Reads the dataset once in batches. With a shuffle buffer the shards are read
+        in random order, and every batch read from a shard replaces random records of
+        the buffer, which are yielded instead.
+        :param batch_size: number of records per batch
+        :param shuffle_buffer: number of records in the shuffle buffer, 0 to read in order
+        :param seed: seed of the shuffling
+        :param drop_last: True to skip a last batch smaller than batch_size
+        :param encode: True to yield (planes, moves, results) with the feature planes of
+                       src.features instead of record arrays
+        :return: generator of arrays of RECORD_DTYPE
+        """
+        for batch in _rebatch(self._chunks(batch_size, shuffle_buffer, seed), batch_size):
+            if drop_last and len(batch) < batch_size:
+                continue
+            if encode:
+                yield encode_packed(batch["position"]), batch["move"], batch["result"]
+            else:
+                yield batch
+
+    def _chunks(self, batch_size, shuffle_buffer, seed):
+        """
+        reads the records in chunks of up to batch_size records, shuffled if a buffer is given
+        """
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self.shards)) if shuffle_buffer else range(len(self.shards))
+        chunks = (np.array(self.shards[shard][start:start + batch_size])
+                  for shard in order for start in range(0, len(self.shards[shard]), batch_size))
+        if not shuffle_buffer:
+            yield from chunks
+            return
+        buffer = np.empty(max(shuffle_buffer, batch_size), dtype=RECORD_DTYPE)
+        filled = 0
+        for chunk in chunks:
+            if filled < len(buffer):
+                count = min(len(chunk), len(buffer) - filled)
+                buffer[filled:filled + count] = chunk[:count]
+                filled += count
+                chunk = chunk[count:]
+                if not len(chunk):
+                    continue
+            slots = rng.choice(len(buffer), len(chunk), replace=False)
+            batch = buffer[slots]
+            buffer[slots] = chunk
+            yield batch
+        rest = buffer[rng.permutation(filled)]
+        for start in range(0, filled, batch_size):
+            yield rest[start:start + batch_size]
+
+
+def _rebatch(chunks, batch_size):
+    """
+    joins and splits chunks of records to batches of batch_size records, only the last
+    batch may be smaller
+    """
+    pending = []
+    count = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        count += len(chunk)
+        if count >= batch_size:
+            records = np.concatenate(pending)
+            full = len(records) - len(records) % batch_size
+            for start in range(0, full, batch_size):
+                yield records[start:start + batch_size]
+            pending = [records[full:]]
+            count = len(records) - full
+    if count:
+        yield np.concatenate(pending)
@@ -0,0 +1,137 @@
+"""
+Tapered evaluation: every piece contributes its material value plus a
+piece-square bonus, once for the middlegame and once for the endgame. The two
+sums are kept incrementally on the Board (mg_score, eg_score) together with the
+game phase, and evaluate blends them by the phase, adding the pawn structure
+terms of src.pawns. Scores are in centipawns, positive for white on the board and
+relative to the side to move in evaluate.
+"""
+from src.bitboard import iter_squares
+from src.pawns import pawn_structure
+from game_params import PIECE_VALUES, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+PIECE_CENTIPAWNS = tuple(int(value * 100) for value in PIECE_VALUES)
+# phase of the starting position, reached when all minor and major pieces are on the board
+MAX_PHASE = 24
+PIECE_PHASE = {PAWN: 0, KNIGHT: 1, BISHOP: 1, ROOK: 2, QUEEN: 4, KING: 0}
+
+# piece-square bonuses from white's point of view, written from row 8 (top) to row 1
+PAWN_MG = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0)
+PAWN_EG = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    20, 20, 20, 20, 20, 20, 20, 20,
+    10, 10, 10, 10, 10, 10, 10, 10,
+    10, 10, 10, 10, 10, 10, 10, 10,
+    0, 0, 0, 0, 0, 0, 0, 0)
+KNIGHT_TABLE = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50)
+BISHOP_TABLE = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20)
+ROOK_TABLE = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0)
+QUEEN_TABLE = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20)
+KING_MG = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20)
+KING_EG = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50)
+
+MG_TABLES = (PAWN_MG, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_MG)
+EG_TABLES = (PAWN_EG, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_EG)
+
+
+def _signed_table(tables, piece):
+    """
+    :return: value plus bonus of the piece code on each square, negative for black
+    """
+    piece_type = piece % 6
+    table = tables[piece_type]
+    if piece < 6:
+        # square 8 * row + col is entry 8 * (7 - row) + col of the table
+        return tuple(PIECE_CENTIPAWNS[piece_type] + table[sq ^ 56] for sq in range(64))
+    return tuple(-PIECE_CENTIPAWNS[piece_type] - table[sq] for sq in range(64))
+
+
+# MG_SCORES[piece][sq]: middlegame score of the piece code on the square, EG_SCORES alike
+MG_SCORES = tuple(_signed_table(MG_TABLES, piece) for piece in range(12))
+EG_SCORES = tuple(_signed_table(EG_TABLES, piece) for piece in range(12))
+PHASE = tuple(PIECE_PHASE[piece % 6] for piece in range(12))
+
+
+def compute_scores(board):
+    """
+    computes middlegame score, endgame score and phase from scratch, see Board
+    :return: (mg_score, eg_score, phase)
+    """
+    mg_score = eg_score = phase = 0
+    for piece, bb in enumerate(board.bitboards):
+        for sq in iter_squares(bb):
+            mg_score += MG_SCORES[piece][sq]
+            eg_score += EG_SCORES[piece][sq]
+            phase += PHASE[piece]
+    return mg_score, eg_score, phase
+
+
+def evaluate(board, pawn_cache=None):
+    """
+    tapered score in centipawns from the point of view of the side to move
+    :param pawn_cache: optional PawnCache to look the pawn structure terms up in
+    """
+    pawn_mg, pawn_eg = pawn_cache.scores(board) if pawn_cache is not None else pawn_structure(board)
+    phase = min(board.phase, MAX_PHASE)
+    score = ((board.mg_score + pawn_mg) * phase
+             + (board.eg_score + pawn_eg) * (MAX_PHASE - phase)) // MAX_PHASE
+    return -score if board.side else score
@@ -0,0 +1,84 @@
+"""
+Vectorized encoding of positions as input planes for a neural network. A batch of
+N positions becomes an array of shape (N, PLANE_COUNT, 8, 8) with plane[row, col]
+for the square 8 * row + col:
+    0-11   one plane per piece code (color * 6 + piece type)
+    12     side to move, all ones if black is to move
+    13-16  castling rights K, Q, k, q, all ones if the right is kept
+    17     en passant square
+"""
+import numpy as np
+from src.board import PACKED_SIZE, NO_EP_SQUARE
+
+PIECE_PLANES = 12
+SIDE_PLANE = 12
+CASTLING_PLANE = 13
+EP_PLANE = 17
+PLANE_COUNT = 18
+
+
+def _square_planes(bitboards):
+    """
+    :param bitboards: uint64 array of shape (N, K)
+    :return: uint8 array of shape (N, K, 8, 8) with the bits of the bitboards
+    """
+    # little-endian bytes are the rows from 1 to 8, little bit order the columns from a to h
+    rows = bitboards.astype("<u8").view(np.uint8).reshape(bitboards.shape + (8,))
+    return np.unpackbits(rows, axis=-1, bitorder="little").reshape(bitboards.shape + (8, 8))
+
+
+def _flag_planes(planes, side, castling, ep_squares):
+    """
+    fills the side to move, castling and en passant planes from arrays of length N
+    """
+    planes[:, SIDE_PLANE] = side[:, None, None]
+    for index in range(4):
+        planes[:, CASTLING_PLANE + index] = ((castling >> index) & 1)[:, None, None]
+    has_ep = ep_squares != NO_EP_SQUARE
+    ep_squares = ep_squares[has_ep]
+    planes[np.flatnonzero(has_ep), EP_PLANE, ep_squares >> 3, ep_squares & 7] = 1
+
+
+def encode_boards(boards, dtype=np.float32):
+    """
+    :param boards: sequence of instances of class Board
+    :param dtype: dtype of the result, e. g. np.float32 or np.uint8
+    :return: array of shape (len(boards), PLANE_COUNT, 8, 8)
+    """
+    count = len(boards)
+    planes = np.zeros((count, PLANE_COUNT, 8, 8), dtype=np.uint8)
+    if count:
+        bitboards = np.array([board.bitboards for board in boards], dtype=np.uint64)
+        planes[:, :PIECE_PLANES] = _square_planes(bitboards)
+        _flag_planes(planes,
+                     np.fromiter((board.side for board in boards), np.uint8, count),
+                     np.fromiter((board.castling for board in boards), np.uint8, count),
+                     np.fromiter((NO_EP_SQUARE if board.ep_square is None else board.ep_square
+                                  for board in boards), np.uint8, count))
+    return planes.astype(dtype, copy=False)
+
+
+def encode_packed(records, dtype=np.float32):
+    """
+    Encodes positions packed with Board.pack without creating Board instances
+    :param records: bytes of concatenated packed positions or uint8 array of shape
+                    (N, PACKED_SIZE)
+    :param dtype: dtype of the result, e. g. np.float32 or np.uint8
+    :return: array of shape (N, PLANE_COUNT, 8, 8)
+    """
+    records = np.frombuffer(records, dtype=np.uint8) if isinstance(records, (bytes, bytearray)) \
+        else np.asarray(records, dtype=np.uint8)
+    records = records.reshape(-1, PACKED_SIZE)
+    count = len(records)
+    occupied = np.unpackbits(records[:, :8], axis=1, bitorder="little").astype(bool)
+    codes = records[:, 8:24]
+    # the 4-bit piece codes of the occupied squares, low nibble first
+    nibbles = np.stack((codes & 15, codes >> 4), axis=2).reshape(count, 32)
+    index = np.cumsum(occupied, axis=1) - 1
+    positions, squares = np.nonzero(occupied)
+    pieces = nibbles[positions, index[positions, squares]]
+    planes = np.zeros((count, PLANE_COUNT, 8, 8), dtype=np.uint8)
+    planes[positions, pieces, squares >> 3, squares & 7] = 1
+    flags = records[:, 24]
+    _flag_planes(planes, flags & 1, flags >> 1, records[:, 25])
+    return planes.astype(dtype, copy=False)
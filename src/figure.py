@@ -1,18 +1,33 @@
-import numpy as np
-import copy
-from game_params import FIELD_ROW_DICT, FIELD_COL_DICT, COLOR_DICT
+from src.bitboard import SQUARE_BB, iter_squares
+from src.attacks import BETWEEN, PAWN_ATTACKS, piece_attacks
+from src.move import encode_move
+from game_params import FIELD_ROW_DICT, FIELD_COL_DICT, COLOR_DICT, COLOR_INDEX, \
+    PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
 
 
 class Figure:
+    piece_type = None
+    # fixed attributes instead of a per-instance dict keep the 32 figures small
+    __slots__ = ("field_col", "field_row", "color", "color_value", "color_index", "value",
+                 "legal_moves", "legal_capture_moves", "short_name")
+
     def __init__(self, field, color):
         self.field_col = FIELD_COL_DICT[field[0]]
         self.field_row = FIELD_ROW_DICT[field[1]]
         self.color = color
         self.color_value = COLOR_DICT[color]
+        self.color_index = COLOR_INDEX[color]
         self.value = 0
         self.legal_moves = set()
         self.legal_capture_moves = set()
 
+    @property
+    def square(self):
+        """
+        index of the square of the figure from 0 (a1) to 63 (h8)
+        """
+        return 8 * self.field_row + self.field_col
+
     def move_to(self, board, new_pos, next_turn):
         """
         Checks if move legal and moves piece if so
@@ -23,28 +38,31 @@ class Figure:
         """
         board.get_covered_squares(next_turn)
         self.get_legal_moves(board)
-        legal_pos = {(self.field_row + move[0], self.field_col + move[1])
-                     for move in self.legal_moves | self.legal_capture_moves}
-        if (FIELD_ROW_DICT[new_pos[1]], FIELD_COL_DICT[new_pos[0]]) in legal_pos:
-            for piece in board.figures:
-                if (piece.field_row == FIELD_ROW_DICT[new_pos[1]]
-                        and piece.field_col == FIELD_COL_DICT[new_pos[0]]):
-                    piece.get_captured(board)
-            old_pos_row = copy.deepcopy(self.field_row)
-            old_pos_col = copy.deepcopy(self.field_col)
-            self.field_row = FIELD_ROW_DICT[new_pos[1]]
-            self.field_col = FIELD_COL_DICT[new_pos[0]]
-            board.create_board()
-            board.king_in_check(self.color)
-            if board.in_check == self.color:
-                self.field_row = old_pos_row
-                self.field_col = old_pos_col
-                board.create_board()
-                return False, "illegal move: king in check"
-            else:
-                return True, "legal move carried out"
-        else:
+        target_row = FIELD_ROW_DICT[new_pos[1]]
+        target_col = FIELD_COL_DICT[new_pos[0]]
+        if (target_row - self.field_row, target_col - self.field_col) \
+                not in self.legal_moves | self.legal_capture_moves:
             return False, f"illegal move: {self.short_name} cannot move to {new_pos}"
+        if board.piece_at(self.square) != self.color_index * 6 + self.piece_type:
+            return False, f"illegal move: {self.short_name} is not on the board"
+        figures = board.figures
+        target = board.piece_at(8 * target_row + target_col)
+        board.make_move(encode_move(self.square, 8 * target_row + target_col))
+        board.king_in_check(self.color)
+        if board.in_check == self.color:
+            board.unmake_move()
+            board.figures = figures
+            return False, "illegal move: king in check"
+        board.figures = figures
+        # the mailbox tells whether there is a figure to look up in the list at all
+        if target is not None:
+            for piece in figures:
+                if piece.field_row == target_row and piece.field_col == target_col:
+                    piece.get_captured(board)
+                    break
+        self.field_row = target_row
+        self.field_col = target_col
+        return True, "legal move carried out"
 
     def get_captured(self, board):
         """
@@ -64,12 +82,7 @@ class Figure:
         :return: True, if path clear, False if not
         """
         if not (target_row > 7 or target_row < 0 or target_col > 7 or target_col < 0):
-            row_step = np.sign(move[0])
-            col_step = np.sign(move[1])
-            sq_cov = not any(board.status[self.field_row + i * row_step,
-                                          self.field_col + i * col_step]
-                             for i in range(1, abs(move[0])))
-            return sq_cov
+            return not board.occupied & BETWEEN[self.square][8 * target_row + target_col]
         else:
             return False
 
@@ -85,21 +98,22 @@ class Figure:
         :param board: current board
         :return:
         """
-        moves = set()
-        capture_moves = set()
-        for move in self.pot_moves:
-            target_row = self.field_row + move[0]
-            target_col = self.field_col + move[1]
-            if self.path_clear(board, move, target_row, target_col):
-                if board.status[target_row, target_col] * self.color_value == 0:
-                    moves.add(move)
-                if board.status[target_row, target_col] * self.color_value < 0:
-                    capture_moves.add(move)
-        self.legal_moves = moves
-        self.legal_capture_moves = capture_moves
+        targets = piece_attacks(self.piece_type, self.color_index, self.square, board.occupied)
+        self.legal_moves = self._offsets(targets & ~board.occupied)
+        self.legal_capture_moves = self._offsets(targets & board.occupancy[1 - self.color_index])
+
+    def _offsets(self, targets):
+        """
+        converts a bitboard of target squares to (row, col) offsets from the figure
+        """
+        return {((sq >> 3) - self.field_row, (sq & 7) - self.field_col)
+                for sq in iter_squares(targets)}
 
 
 class Pawn(Figure):
+    piece_type = PAWN
+    __slots__ = ()
+
     def __init__(self, field, color):
         """
         Class with methods and properties of pawns
@@ -107,10 +121,6 @@ class Pawn(Figure):
         :param color: Color (black or white) of the pawn
         """
         Figure.__init__(self, field, color)
-        self.pot_capture_moves = {(1 * self.color_value, 1),
-                                  (1 * self.color_value, -1)}
-        self.pot_moves = {(1 * self.color_value, 0),
-                          (2 * self.color_value, 0)}
         self.value = 1 * self.color_value
         self.short_name = self.color[0] + "p"
 
@@ -131,28 +141,21 @@ class Pawn(Figure):
         :return:
         """
         moves = set()
-        capture_moves = set()
-        if not (self.field_row*self.color_value == 1 or self.field_row*self.color_value == -6):
-            self.pot_moves = {(1*self.color_value, 0)}
-
-        for move in self.pot_moves:
-            target_row = self.field_row + move[0]
-            target_col = self.field_col + move[1]
-            if self.path_clear(board, move, target_row, target_col):
-                if board.status[target_row, target_col] * self.color_value == 0:
-                    moves.add(move)
-
-        for move in self.pot_capture_moves:
-            target_row = self.field_row + move[0]
-            target_col = self.field_col + move[1]
-            if self.path_clear(board, move, target_row, target_col):
-                if board.status[target_row, target_col] * self.color_value < 0:
-                    capture_moves.add(move)
+        target_row = self.field_row + self.color_value
+        if 0 <= target_row <= 7 and not board.occupied & SQUARE_BB[8 * target_row + self.field_col]:
+            moves.add((self.color_value, 0))
+            if (self.field_row * self.color_value == 1 or self.field_row * self.color_value == -6) \
+                    and not board.occupied & SQUARE_BB[8 * (target_row + self.color_value) + self.field_col]:
+                moves.add((2 * self.color_value, 0))
         self.legal_moves = moves
-        self.legal_capture_moves = capture_moves
+        self.legal_capture_moves = self._offsets(PAWN_ATTACKS[self.color_index][self.square]
+                                                 & board.occupancy[1 - self.color_index])
 
 
 class Knight(Figure):
+    piece_type = KNIGHT
+    __slots__ = ()
+
     def __init__(self, field, color):
         """
         Class with methods and properties of knights
@@ -160,36 +163,14 @@ class Knight(Figure):
         :param color: Color (black or white) of the knight
         """
         Figure.__init__(self, field, color)
-        self.pot_moves = {(2, 1), (1, 2), (-1, 2), (-2, 1),
-                          (-2, -1), (-1, -2), (1, -2), (2, -1)}
         self.value = 2.5 * self.color_value
         self.short_name = self.color[0] + "N"
 
-    def get_legal_moves(self, board):
-        """
-        get all legal moves from potential moves considering the current board.
-        General restrictions:
-        - cannot capture-move to a square where a piece of the same color stands
-        - cannot capture-move to an empty square
-        - cannot move to a square where a piece stands
-        :param board: current board
-        :return:
-        """
-        moves = set()
-        capture_moves = set()
-        for move in self.pot_moves:
-            target_row = self.field_row + move[0]
-            target_col = self.field_col + move[1]
-            if not (target_row > 7 or target_row < 0 or target_col > 7 or target_col < 0):
-                if board.status[target_row, target_col] == 0:
-                    moves.add(move)
-                if board.status[target_row, target_col] * self.color_value < 0:
-                    capture_moves.add(move)
-        self.legal_moves = moves
-        self.legal_capture_moves = capture_moves
-
 
 class Bishop(Figure):
+    piece_type = BISHOP
+    __slots__ = ()
+
     def __init__(self, field, color):
         """
         Class with methods and properties of bishops
@@ -197,15 +178,14 @@ class Bishop(Figure):
         :param color: Color (black or white) of the bishop
         """
         Figure.__init__(self, field, color)
-        self.pot_moves = {(i, -i) for i in range(-7, 0)} \
-                             | {(i, -i) for i in range(1, 8)} \
-                             | {(i, i) for i in range(-7, 0)} \
-                             | {(i, i) for i in range(1, 8)}
         self.value = 3.5 * self.color_value
         self.short_name = self.color[0] + "B"
 
 
 class Rook(Figure):
+    piece_type = ROOK
+    __slots__ = ()
+
     def __init__(self, field, color):
         """
         Class with methods and properties of rooks
@@ -213,15 +193,14 @@ class Rook(Figure):
         :param color: Color (black or white) of the rook
         """
         Figure.__init__(self, field, color)
-        self.pot_moves = {(i, 0) for i in range(-7, 0)} \
-                         | {(i, 0) for i in range(1, 8)} \
-                         | {(0, i) for i in range(-7, 0)} \
-                         | {(0, i) for i in range(1, 8)}
         self.value = 5 * self.color_value
         self.short_name = self.color[0] + "R"
 
 
 class Queen(Figure):
+    piece_type = QUEEN
+    __slots__ = ()
+
     def __init__(self, field, color):
         """
         Class with methods and properties of Queens
@@ -229,19 +208,14 @@ class Queen(Figure):
         :param color: Color (black or white) of the queen
         """
         Figure.__init__(self, field, color)
-        self.pot_moves = {(i, 0) for i in range(-7, 0)} \
-                         | {(i, 0) for i in range(1, 8)} \
-                         | {(0, i) for i in range(-7, 0)} \
-                         | {(0, i) for i in range(1, 8)} \
-                         | {(i, -i) for i in range(-7, 0)} \
-                         | {(i, -i) for i in range(1, 8)} \
-                         | {(i, i) for i in range(-7, 0)} \
-                         | {(i, i) for i in range(1, 8)}
         self.value = 9 * self.color_value
         self.short_name = self.color[0] + "Q"
 
 
 class King(Figure):
+    piece_type = KING
+    __slots__ = ()
+
     def __init__(self, field, color):
         """
         Class with methods and properties of kings
@@ -249,7 +223,9 @@ class King(Figure):
         :param color: Color (black or white) of the king
         """
         Figure.__init__(self, field, color)
-        self.pot_moves = {(1, 0), (1, 1), (0, 1), (-1, 1),
-                          (-1, 0), (-1, -1), (0, -1), (1, -1)}
         self.value = 10 * self.color_value
         self.short_name = self.color[0] + "K"
+
+
+# figure class per piece type
+FIGURE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
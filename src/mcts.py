@@ -0,0 +1,273 @@
+"""
+Monte Carlo tree search with PUCT selection as in AlphaZero. The tree lives in
+flat numpy arrays indexed by node number; the children of a node occupy one
+contiguous block. Simulations are run in batches: each one walks down to a leaf
+adding virtual loss to its path, so that the following ones of the same batch
+spread over other leaves, then all leaves are evaluated with one call of the
+value function. After a move is played its subtree becomes the new root, the
+rest of the tree is only reclaimed when the node store runs full. Each node takes
+29 bytes, so millions of nodes fit in tens of megabytes.
+"""
+import math
+import numpy as np
+from src.evaluation import evaluate
+from src.search import in_check
+
+# node states
+UNEXPANDED = 0
+EXPANDED = 1
+TERMINAL = 2
+# (name, dtype) of the per-node arrays
+NODE_FIELDS = (("parent", np.int32), ("first_child", np.int32), ("child_count", np.int16),
+               ("move", np.uint16), ("prior", np.float32), ("visits", np.int32),
+               ("value_sum", np.float32), ("state", np.int8), ("terminal_value", np.float32))
+# maximum number of legal moves in a chess position
+MAX_MOVES = 218
+# centipawns of the static evaluation that correspond to a value of tanh(1)
+VALUE_SCALE = 400
+
+
+def static_values(boards):
+    """
+    default value function: the static evaluation squashed to [-1, 1]
+    :return: array of the values for the side to move
+    """
+    return np.tanh(np.array([evaluate(board) for board in boards], dtype=np.float32) / VALUE_SCALE)
+
+
+def uniform_priors(board, moves):
+    """
+    default prior function: the same prior for every legal move
+    """
+    return np.full(len(moves), 1 / len(moves), dtype=np.float32)
+
+
+class MCTS:
+    def __init__(self, board, value_fn=None, prior_fn=None, c_puct=1.5, batch_size=16,
+                 virtual_loss=3, capacity=1 << 16, max_nodes=1 << 24):
+        """
+        :param board: instance of class Board with the root position, it is not changed
+        :param value_fn: callable mapping a list of boards to an array of values in [-1, 1]
+                         for the side to move, e. g. BatchEvaluator.evaluate_many of src.nn
+        :param prior_fn: callable (board, moves) -> array of move probabilities
+        :param c_puct: weight of the exploration term
+        :param batch_size: number of simulations whose leaves are evaluated together
+        :param virtual_loss: number of lost visits added to the path of a pending simulation
+        :param capacity: initial number of nodes of the store
+        :param max_nodes: number of nodes the store may grow to
+        """
+        self.board = board.copy()
+        self.value_fn = value_fn or static_values
+        self.prior_fn = prior_fn or uniform_priors
+        self.c_puct = c_puct
+        self.batch_size = batch_size
+        self.virtual_loss = virtual_loss
+        self.max_nodes = max_nodes
+        self._allocate_store(capacity)
+        self._new_root()
+
+    def _allocate_store(self, capacity):
+        for name, dtype in NODE_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.capacity = capacity
+
+    def _new_root(self):
+        self.first_child[0] = -1
+        self.parent[0] = -1
+        self.child_count[0] = self.visits[0] = self.state[0] = 0
+        self.value_sum[0] = 0
+        self.root = 0
+        self.used = 1
+
+    @property
+    def node_count(self):
+        """
+        number of nodes in the store, including those not reachable from the root
+        """
+        return self.used
+
+    def search(self, simulations):
+        """
+        runs simulations from the root position
+        :param simulations: number of simulations
+        """
+        done = 0
+        while done < simulations:
+            count = min(self.batch_size, simulations - done)
+            if self.root != 0 and self.used + count * MAX_MOVES > self.capacity:
+                # reclaim the nodes of earlier moves before the store has to grow, the node
+                # indices must not change while the simulations of a batch are pending
+                self._compact()
+            self._run_batch(count)
+            done += count
+
+    def _run_batch(self, count):
+        board = self.board
+        leaves = []
+        for _ in range(count):
+            node = self.root
+            path = [node]
+            while self.state[node] == EXPANDED:
+                node = self._select(node)
+                board.make_move(int(self.move[node]))
+                path.append(node)
+            self.visits[path] += self.virtual_loss
+            self.value_sum[path] -= self.virtual_loss
+            leaves.append((path, board.copy() if self.state[node] == UNEXPANDED else None))
+            for _ in range(len(path) - 1):
+                board.unmake_move()
+        # evaluate every new leaf once, even if several simulations reached it
+        new_leaves = {}
+        for path, leaf_board in leaves:
+            if leaf_board is not None and path[-1] not in new_leaves:
+                new_leaves[path[-1]] = leaf_board
+        values = {}
+        if new_leaves:
+            nodes = list(new_leaves)
+            for node, value in zip(nodes, self.value_fn([new_leaves[node] for node in nodes])):
+                values[node] = self._expand(node, new_leaves[node], float(value))
+        for path, _ in leaves:
+            leaf = path[-1]
+            value = values[leaf] if leaf in values else float(self.terminal_value[leaf])
+            self._backup(path, value)
+
+    def _select(self, node):
+        """
+        :return: child of node with the highest PUCT score
+        """
+        start = int(self.first_child[node])
+        end = start + int(self.child_count[node])
+        visits = self.visits[start:end]
+        q = np.where(visits > 0, self.value_sum[start:end] / np.maximum(visits, 1), 0)
+        u = self.c_puct * self.prior[start:end] * (math.sqrt(self.visits[node]) / (1 + visits))
+        return start + int(np.argmax(q + u))
+
+    def _expand(self, node, board, value):
+        """
+        adds the children of a leaf or marks it as terminal
+        :param value: value of the position for the side to move from the value function
+        :return: value to back up for the side to move
+        """
+        moves = board.generate_legal_moves()
+        if not moves or board.halfmove_clock >= 100 or board.repetition_count() >= 2:
+            self.state[node] = TERMINAL
+            self.terminal_value[node] = -1.0 if not moves and in_check(board) else 0.0
+            return float(self.terminal_value[node])
+        start = self._allocate(len(moves))
+        if start < 0:
+            # the store is full: the node stays a leaf that is evaluated again when reached
+            return value
+        end = start + len(moves)
+        self.parent[start:end] = node
+        self.first_child[start:end] = -1
+        self.child_count[start:end] = 0
+        self.move[start:end] = moves
+        self.prior[start:end] = self.prior_fn(board, moves)
+        self.visits[start:end] = 0
+        self.value_sum[start:end] = 0
+        self.state[start:end] = UNEXPANDED
+        self.first_child[node] = start
+        self.child_count[node] = len(moves)
+        self.state[node] = EXPANDED
+        return value
+
+    def _backup(self, path, value):
+        """
+        adds the result of a simulation to the nodes of its path and removes its virtual loss
+        :param value: value of the leaf for its side to move
+        """
+        # the value of a node is counted for the side that moved into it
+        value = -value
+        for node in reversed(path):
+            self.visits[node] += 1 - self.virtual_loss
+            self.value_sum[node] += value + self.virtual_loss
+            value = -value
+
+    def _allocate(self, count):
+        """
+        :return: index of a free block of count nodes, -1 if the store is full
+        """
+        while self.used + count > self.capacity and self.capacity < self.max_nodes:
+            self._grow(min(2 * self.capacity, self.max_nodes))
+        if self.used + count > self.capacity:
+            return -1
+        start = self.used
+        self.used += count
+        return start
+
+    def _grow(self, capacity):
+        for name, dtype in NODE_FIELDS:
+            array = np.zeros(capacity, dtype=dtype)
+            array[:self.used] = getattr(self, name)[:self.used]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def _compact(self):
+        """
+        moves the subtree of the root to the front of the store, dropping all other nodes
+        """
+        old = {name: getattr(self, name) for name, _ in NODE_FIELDS}
+        self._allocate_store(self.capacity)
+        for name, _ in NODE_FIELDS:
+            getattr(self, name)[0] = old[name][self.root]
+        self.parent[0] = -1
+        used = 1
+        stack = [(self.root, 0)]
+        while stack:
+            old_node, new_node = stack.pop()
+            start = int(old["first_child"][old_node])
+            count = int(old["child_count"][old_node])
+            for name, _ in NODE_FIELDS:
+                getattr(self, name)[used:used + count] = old[name][start:start + count]
+            self.parent[used:used + count] = new_node
+            self.first_child[new_node] = used
+            for offset in np.flatnonzero(old["state"][start:start + count] == EXPANDED):
+                stack.append((start + int(offset), used + int(offset)))
+            used += count
+        self.root = 0
+        self.used = used
+
+    def policy(self):
+        """
+        :return: (legal moves, visit count of each) at the root
+        """
+        if self.state[self.root] != EXPANDED:
+            return [], np.zeros(0, dtype=np.int32)
+        start = int(self.first_child[self.root])
+        end = start + int(self.child_count[self.root])
+        return [int(move) for move in self.move[start:end]], self.visits[start:end].copy()
+
+    def best_move(self, temperature=0.0, rng=None):
+        """
+        :param temperature: 0 for the most visited move, otherwise moves are sampled with
+                            probabilities proportional to visits ** (1 / temperature)
+        :param rng: optional numpy Generator for the sampling
+        :return: move as integer, None if the root has no children
+        """
+        moves, visits = self.policy()
+        if not moves:
+            return None
+        if not temperature:
+            return moves[int(np.argmax(visits))]
+        weights = visits.astype(np.float64) ** (1 / temperature)
+        if not weights.sum():
+            weights[:] = 1
+        rng = rng or np.random.default_rng()
+        return moves[int(rng.choice(len(moves), p=weights / weights.sum()))]
+
+    def advance(self, move):
+        """
+        plays a move at the root and keeps its subtree with all statistics as new tree
+        :param move: move as integer
+        """
+        root = self.root
+        self.board.make_move(move)
+        if self.state[root] == EXPANDED:
+            start = int(self.first_child[root])
+            moves = self.move[start:start + int(self.child_count[root])]
+            matches = np.flatnonzero(moves == move)
+            if len(matches):
+                self.root = start + int(matches[0])
+                self.parent[self.root] = -1
+                return
+        self._new_root()
@@ -0,0 +1,61 @@
+"""
+Moves are encoded as plain integers: bits 0-5 hold the origin square, bits 6-11
+the target square (square indices as in src.bitboard) and bits 12-14 the piece
+type a pawn promotes to (0 for no promotion). Castling is encoded as the king
+moving two squares, en passant as the pawn moving to the en passant square.
+"""
+from src.bitboard import square_name, parse_square
+from game_params import KNIGHT, BISHOP, ROOK, QUEEN
+
+PROMOTION_NAMES = {KNIGHT: "n", BISHOP: "b", ROOK: "r", QUEEN: "q"}
+PROMOTION_TYPES = {name: piece_type for piece_type, name in PROMOTION_NAMES.items()}
+
+
+def encode_move(from_sq, to_sq, promotion=0):
+    """
+    :param from_sq: square index the piece moves from
+    :param to_sq: square index the piece moves to
+    :param promotion: piece type a pawn promotes to, 0 if none
+    :return: move as integer
+    """
+    return from_sq | (to_sq << 6) | (promotion << 12)
+
+
+def move_from(move):
+    """
+    :return: square index the piece moves from
+    """
+    return move & 63
+
+
+def move_target(move):
+    """
+    :return: square index the piece moves to
+    """
+    return (move >> 6) & 63
+
+
+def move_promotion(move):
+    """
+    :return: piece type a pawn promotes to, 0 if none
+    """
+    return move >> 12
+
+
+def move_name(move):
+    """
+    :return: move in coordinate notation, e. g. "e2e4" or "e7e8q"
+    """
+    name = square_name(move_from(move)) + square_name(move_target(move))
+    if move_promotion(move):
+        name += PROMOTION_NAMES[move_promotion(move)]
+    return name
+
+
+def parse_move(name):
+    """
+    :param name: move in coordinate notation, e. g. "e2e4" or "e7e8q"
+    :return: move as integer
+    """
+    promotion = PROMOTION_TYPES[name[4]] if len(name) > 4 else 0
+    return encode_move(parse_square(name[0:2]), parse_square(name[2:4]), promotion)
@@ -0,0 +1,209 @@
+"""
+Learned evaluation on the CPU. ValueNetwork is a small NumPy MLP on the feature
+planes of src.features. BatchEvaluator serves many concurrent searches or games:
+positions requested from any thread are collected into one batch until the
+batch is full or the oldest request has waited max_latency seconds, evaluated
+with a single forward pass and cached by their Zobrist key.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+from src.features import encode_boards, PLANE_COUNT
+
+# centipawns corresponding to a value of 1, for use of the network in src.search
+VALUE_CENTIPAWNS = 1000
+
+
+class ValueNetwork:
+    def __init__(self, hidden=(256, 32), seed=0, weights=None):
+        """
+        :param hidden: sizes of the hidden layers
+        :param seed: seed of the random initial weights
+        :param weights: optional list of (weight matrix, bias) per layer, e. g. from load
+        """
+        if weights is None:
+            rng = np.random.default_rng(seed)
+            sizes = (PLANE_COUNT * 64,) + tuple(hidden) + (1,)
+            # He initialization for the rectified hidden layers
+            weights = [((rng.standard_normal((n_in, n_out)) * np.sqrt(2 / n_in)).astype(np.float32),
+                        np.zeros(n_out, dtype=np.float32))
+                       for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+        self.layers = weights
+
+    def __call__(self, planes):
+        """
+        :param planes: array of shape (N, PLANE_COUNT, 8, 8)
+        :return: float32 array of N values in [-1, 1] for the side to move
+        """
+        x = np.asarray(planes, dtype=np.float32).reshape(len(planes), -1)
+        for weight, bias in self.layers[:-1]:
+            x = np.maximum(x @ weight + bias, 0)
+        weight, bias = self.layers[-1]
+        return np.tanh(x @ weight + bias).reshape(-1)
+
+    def save(self, path):
+        np.savez(path, **{f"{kind}{index}": array for index, layer in enumerate(self.layers)
+                          for kind, array in zip(("w", "b"), layer)})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(weights=[(data[f"w{index}"], data[f"b{index}"])
+                                for index in range(len(data.files) // 2)])
+
+
+class BatchEvaluator:
+    def __init__(self, model, max_batch_size=256, max_latency=0.002, cache_size=1 << 18):
+        """
+        :param model: callable mapping feature planes (N, PLANE_COUNT, 8, 8) to N values
+                      for the side to move, e. g. a ValueNetwork
+        :param max_batch_size: maximum number of positions per forward pass
+        :param max_latency: seconds a request waits at most for the batch to fill up
+        :param cache_size: maximum number of cached values, least recently used are evicted
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.requests = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.evaluated = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @property
+    def mean_batch_size(self):
+        return self.evaluated / self.batches if self.batches else 0.0
+
+    @property
+    def hit_rate(self):
+        return self.cache_hits / self.requests if self.requests else 0.0
+
+    def submit(self, board):
+        """
+        requests the value of a position without waiting for it
+        :param board: instance of class Board, it may be changed after the call
+        :return: concurrent.futures.Future of the value for the side to move
+        :raises RuntimeError: if the evaluator is closed
+        """
+        future = Future()
+        key = board.zobrist_key
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchEvaluator is closed")
+            self.requests += 1
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache_hits += 1
+                self.cache.move_to_end(key)
+                future.set_result(value)
+                return future
+            if not self._pending:
+                self._wakeup.notify()
+            self._pending.append((key, board.copy(), future, time.perf_counter()))
+            if len(self._pending) >= self.max_batch_size:
+                self._wakeup.notify()
+        return future
+
+    def evaluate(self, board):
+        """
+        :return: value of the position for the side to move, waits for its batch
+        """
+        return self.submit(board).result()
+
+    def score(self, board):
+        """
+        :return: value of the position in centipawns for the side to move, usable as
+                 evaluator of src.search.Searcher
+        """
+        return int(self.evaluate(board) * VALUE_CENTIPAWNS)
+
+    def evaluate_many(self, boards):
+        """
+        evaluates the positions in the calling thread in batches of max_batch_size,
+        for callers that collect their leaves themselves
+        :return: float array of the values for the side to move
+        """
+        values = np.empty(len(boards), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for index, board in enumerate(boards):
+                self.requests += 1
+                value = self.cache.get(board.zobrist_key)
+                if value is None:
+                    missing.append(index)
+                else:
+                    self.cache_hits += 1
+                    values[index] = value
+        for start in range(0, len(missing), self.max_batch_size):
+            chunk = missing[start:start + self.max_batch_size]
+            results = self._forward([boards[index] for index in chunk])
+            values[chunk] = results
+            with self._lock:
+                self._store([boards[index].zobrist_key for index in chunk], results)
+        return values
+
+    def _forward(self, boards):
+        values = np.asarray(self.model(encode_boards(boards)), dtype=np.float32).reshape(-1)
+        with self._lock:
+            self.batches += 1
+            self.evaluated += len(boards)
+        return values
+
+    def _store(self, keys, values):
+        cache = self.cache
+        for key, value in zip(keys, values):
+            cache[key] = float(value)
+            cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _serve(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if self._closed and not self._pending:
+                    return
+                deadline = self._pending[0][3] + self.max_latency
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+            try:
+                values = self._forward([board for _, board, _, _ in batch])
+            except Exception as error:
+                for _, _, future, _ in batch:
+                    future.set_exception(error)
+                continue
+            with self._lock:
+                self._store([key for key, _, _, _ in batch], values)
+            for (_, _, future, _), value in zip(batch, values):
+                future.set_result(float(value))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+
+    def stats(self):
+        return {"requests": self.requests, "cache_hits": self.cache_hits, "hit_rate": self.hit_rate,
+                "batches": self.batches, "mean_batch_size": self.mean_batch_size}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,97 @@
+"""
+Lazy SMP: several worker processes search the same root position at the same
+time and share one transposition table in shared memory. The entries one worker
+stores cut off parts of the tree for the others; odd workers start one iteration
+deeper so that the workers spread over different parts of the tree.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from src.search import Searcher
+from src.transposition import TranspositionTable
+
+# per worker process: searcher on the shared table and the shared memory it uses
+_worker_searcher = None
+_worker_memory = None
+
+
+def _init_worker(memory_name, tt_size_mb):
+    global _worker_searcher, _worker_memory
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_searcher = Searcher(tt=TranspositionTable(tt_size_mb, buffer=_worker_memory.buf))
+
+
+def _search_worker(board, worker_id, search_id, max_depth, wall_deadline, node_limit):
+    """
+    :param wall_deadline: time.time() value of the hard deadline, None if unlimited
+    :return: (worker_id, SearchResult, probes, hits)
+    """
+    deadline = None
+    if wall_deadline is not None:
+        deadline = time.perf_counter() + wall_deadline - time.time()
+    tt = _worker_searcher.tt
+    # all workers use the age of the current search, Searcher.search increments it
+    tt.age = (search_id - 1) & 63
+    tt.probes = tt.hits = 0
+    result = _worker_searcher.search(board, max_depth, node_limit=node_limit, deadline=deadline,
+                                     start_depth=1 + worker_id % 2)
+    return worker_id, result, tt.probes, tt.hits
+
+
+class ParallelSearcher:
+    def __init__(self, workers=None, tt_size_mb=64):
+        """
+        :param workers: number of worker processes, defaults to the number of cores
+        :param tt_size_mb: memory cap of the shared transposition table in megabytes
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_size_mb = tt_size_mb
+        self.memory = shared_memory.SharedMemory(create=True,
+                                                 size=TranspositionTable.size_for(tt_size_mb))
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(self.memory.name, tt_size_mb))
+        self.search_id = 0
+        self.hit_rate = 0.0
+
+    def search(self, board, max_depth=64, time_limit=None, node_limit=None):
+        """
+        Searches the position with all workers until max_depth or a limit is reached
+        :param board: instance of class Board, it is not changed
+        :param time_limit: wall-clock budget in seconds
+        :param node_limit: maximum number of nodes of all workers together
+        :return: SearchResult of the worker with the deepest completed iteration, with
+                 nodes and nps summed over all workers
+        """
+        start = time.perf_counter()
+        self.search_id += 1
+        wall_deadline = time.time() + time_limit if time_limit is not None else None
+        if node_limit is None:
+            worker_limits = [None] * self.workers
+        else:
+            # no more workers than nodes, the remainder of the split goes to the first workers
+            workers = max(1, min(self.workers, node_limit))
+            share, remainder = divmod(node_limit, workers)
+            worker_limits = [share + (worker_id < remainder) for worker_id in range(workers)]
+        futures = [self.pool.submit(_search_worker, board, worker_id, self.search_id, max_depth,
+                                    wall_deadline, worker_limit)
+                   for worker_id, worker_limit in enumerate(worker_limits)]
+        outcomes = sorted(future.result() for future in futures)
+        best = max((result for _, result, _, _ in outcomes), key=lambda result: result.depth)
+        probes = sum(outcome[2] for outcome in outcomes)
+        self.hit_rate = sum(outcome[3] for outcome in outcomes) / probes if probes else 0.0
+        nodes = sum(result.nodes for _, result, _, _ in outcomes)
+        seconds = time.perf_counter() - start
+        return best._replace(nodes=nodes, seconds=seconds,
+                             nps=int(nodes / seconds) if seconds > 0 else 0)
+
+    def close(self):
+        self.pool.shutdown()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,124 @@
+"""
+Pawn structure terms of the evaluation: doubled, isolated and passed pawns and the
+pawn shield in front of the king. They only depend on the pawns and kings, so
+their scores are cached by the pawn key of the board (see src.zobrist) in a
+bounded least recently used cache.
+"""
+from collections import OrderedDict
+from src.bitboard import FULL, iter_squares, lsb
+from game_params import WHITE, BLACK, PAWN, KING
+
+# (middlegame, endgame) penalties per pawn
+DOUBLED_PAWN = (-10, -20)
+ISOLATED_PAWN = (-10, -15)
+# bonus of a passed pawn per row counted from its own side
+PASSED_PAWN_MG = (0, 5, 10, 15, 25, 40, 60, 0)
+PASSED_PAWN_EG = (0, 10, 15, 25, 40, 60, 90, 0)
+# middlegame bonus per own pawn directly in front of the king and one row further
+SHIELD_PAWN = (10, 5)
+
+COL_BB = tuple(0x0101010101010101 << col for col in range(8))
+ROW_BB = tuple(0xFF << (8 * row) for row in range(8))
+ADJACENT_COLS_BB = tuple((COL_BB[col - 1] if col > 0 else 0) | (COL_BB[col + 1] if col < 7 else 0)
+                         for col in range(8))
+
+
+def _rows_ahead(color, row):
+    """
+    :return: bitboard of the rows in front of row from the point of view of color
+    """
+    if color == WHITE:
+        return (FULL << (8 * (row + 1))) & FULL
+    return (1 << (8 * row)) - 1
+
+
+# PASSED_MASK[color][sq]: squares that must be free of enemy pawns for a passed pawn on sq
+PASSED_MASK = tuple(tuple(_rows_ahead(color, sq >> 3) & (COL_BB[sq & 7] | ADJACENT_COLS_BB[sq & 7])
+                          for sq in range(64)) for color in (WHITE, BLACK))
+# FRONT_MASK[color][sq]: squares in front of sq on its column, a passed pawn has no own pawn there
+FRONT_MASK = tuple(tuple(_rows_ahead(color, sq >> 3) & COL_BB[sq & 7] for sq in range(64))
+                   for color in (WHITE, BLACK))
+# SHIELD_MASKS[color][sq]: the squares in front of a king on sq one and two rows away
+SHIELD_MASKS = tuple(tuple(tuple(ROW_BB[(sq >> 3) + distance * (1 - 2 * color)]
+                                 & (COL_BB[sq & 7] | ADJACENT_COLS_BB[sq & 7])
+                                 if 0 <= (sq >> 3) + distance * (1 - 2 * color) <= 7 else 0
+                                 for distance in (1, 2))
+                           for sq in range(64)) for color in (WHITE, BLACK))
+
+
+def pawn_structure(board):
+    """
+    computes the pawn structure terms from scratch
+    :param board: instance of class Board
+    :return: (middlegame score, endgame score) in centipawns, positive for white
+    """
+    scores = [0, 0]
+    pawns = (board.bitboards[WHITE * 6 + PAWN], board.bitboards[BLACK * 6 + PAWN])
+    for color in (WHITE, BLACK):
+        sign = 1 - 2 * color
+        own, enemy = pawns[color], pawns[color ^ 1]
+        for col in range(8):
+            count = (own & COL_BB[col]).bit_count()
+            if count > 1:
+                scores[0] += sign * DOUBLED_PAWN[0] * (count - 1)
+                scores[1] += sign * DOUBLED_PAWN[1] * (count - 1)
+            if count and not own & ADJACENT_COLS_BB[col]:
+                scores[0] += sign * ISOLATED_PAWN[0] * count
+                scores[1] += sign * ISOLATED_PAWN[1] * count
+        for sq in iter_squares(own):
+            # of doubled pawns only the frontmost one can be passed
+            if not enemy & PASSED_MASK[color][sq] and not own & FRONT_MASK[color][sq]:
+                row = sq >> 3 if color == WHITE else 7 - (sq >> 3)
+                scores[0] += sign * PASSED_PAWN_MG[row]
+                scores[1] += sign * PASSED_PAWN_EG[row]
+        king = board.bitboards[color * 6 + KING]
+        if king:
+            for mask, bonus in zip(SHIELD_MASKS[color][lsb(king)], SHIELD_PAWN):
+                scores[0] += sign * bonus * (own & mask).bit_count()
+    return scores[0], scores[1]
+
+
+class PawnCache:
+    def __init__(self, capacity=16384):
+        """
+        :param capacity: maximum number of cached pawn structures, the least recently
+                         used one is evicted when it is exceeded
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def hit_rate(self):
+        """
+        share of lookups answered from the cache
+        """
+        return self.hits / self.probes if self.probes else 0.0
+
+    def scores(self, board):
+        """
+        :param board: instance of class Board
+        :return: pawn_structure(board), from the cache if the pawn key is known
+        """
+        self.probes += 1
+        key = board.pawn_key
+        entries = self.entries
+        scores = entries.get(key)
+        if scores is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return scores
+        scores = pawn_structure(board)
+        entries[key] = scores
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return scores
+
+    def clear(self):
+        self.entries.clear()
+        self.probes = self.hits = 0
+
+    def stats(self):
+        return {"entries": len(self.entries), "probes": self.probes, "hits": self.hits,
+                "hit_rate": self.hit_rate}
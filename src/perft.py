@@ -0,0 +1,133 @@
+"""
+Perft: counts the leaf nodes of the legal move tree to a fixed depth. Comparing
+the counts with published numbers checks the move generator, timing them
+measures its throughput.
+Usage:
+    python -m src.perft 4
+    python -m src.perft 3 --fen "<FEN>" --divide
+    python -m src.perft --suite [--record FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import time
+from src.board import Board
+from src.move import move_name
+from game_params import START_FEN
+
+# name, FEN and known node counts per depth of standard perft positions
+STANDARD_POSITIONS = [
+    ("start", START_FEN,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("promotions", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("middlegame", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+]
+
+
+def perft(board, depth):
+    """
+    :param board: instance of class Board, side to move as in board.side
+    :param depth: number of plies
+    :return: number of leaf nodes
+    """
+    if depth == 0:
+        return 1
+    moves = board.generate_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    :return: dict from each legal root move in coordinate notation to its perft count,
+             empty for depth 0, which has no root moves
+    """
+    counts = {}
+    if depth < 1:
+        return counts
+    for move in board.generate_legal_moves():
+        board.make_move(move)
+        counts[move_name(move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def run_suite(max_depth=None, positions=STANDARD_POSITIONS):
+    """
+    Runs perft on the standard positions up to their deepest known count
+    :param max_depth: optional limit of the depth per position
+    :return: list of dicts with name, depth, nodes, expected, seconds and nps
+    """
+    results = []
+    for name, fen, counts in positions:
+        depth = max(counts) if max_depth is None else min(max(counts), max_depth)
+        board = Board.from_fen(fen)
+        start = time.perf_counter()
+        nodes = perft(board, depth)
+        seconds = time.perf_counter() - start
+        results.append({"name": name, "depth": depth, "nodes": nodes,
+                        "expected": counts[depth], "seconds": round(seconds, 3),
+                        "nps": int(nodes / seconds) if seconds > 0 else 0})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="perft move generator test")
+    parser.add_argument("depth", type=int, nargs="?", default=3)
+    parser.add_argument("--fen", default=START_FEN)
+    parser.add_argument("--divide", action="store_true", help="print the count per root move")
+    parser.add_argument("--suite", action="store_true", help="run the standard positions")
+    parser.add_argument("--max-depth", type=int, help="depth limit for --suite")
+    parser.add_argument("--record", help="write the suite timings to this JSON file")
+    parser.add_argument("--baseline", help="compare the suite with timings from this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.suite:
+        results = run_suite(args.max_depth)
+        baseline = {}
+        if args.baseline:
+            with open(args.baseline) as file:
+                baseline = {(entry["name"], entry["depth"]): entry for entry in json.load(file)}
+        failed = False
+        for result in results:
+            status = "ok" if result["nodes"] == result["expected"] else "FAILED"
+            failed |= status != "ok"
+            line = f"{result['name']:<12} depth {result['depth']} nodes {result['nodes']:>9} " \
+                   f"{status:<6} {result['seconds']:>8.3f}s {result['nps']:>9} nps"
+            reference = baseline.get((result["name"], result["depth"]))
+            if reference and reference["nps"]:
+                line += f"  x{result['nps'] / reference['nps']:.2f} vs baseline"
+            print(line)
+        if args.record:
+            with open(args.record, "w") as file:
+                json.dump(results, file, indent=2)
+        return 1 if failed else 0
+
+    board = Board.from_fen(args.fen)
+    start = time.perf_counter()
+    # at depth 0 there are no root moves to divide by
+    if args.divide and args.depth > 0:
+        counts = divide(board, args.depth)
+        for name in sorted(counts):
+            print(f"{name}: {counts[name]}")
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, args.depth)
+    seconds = time.perf_counter() - start
+    print(f"nodes {nodes}  time {seconds:.3f}s  nps {int(nodes / seconds) if seconds > 0 else 0}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""
+Streaming reader for games in Portable Game Notation. Games are read line by
+line and yielded one at a time, so files larger than the memory can be
+processed; SAN moves are resolved against the legal moves of a Board and
+replayed with make_move.
+Usage:
+    python -m src.pgn games.pgn [more.pgn ...] [--limit N]
+"""
+import argparse
+import re
+import time
+from collections import namedtuple
+from src.board import Board, CASTLING_ROOK_SQUARES
+from src.bitboard import parse_square, lsb
+from src.move import move_from, move_target, move_promotion
+from game_params import START_FEN, PIECE_SHORT_NAMES, PAWN, KING
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+# piece type per SAN piece letter
+SAN_PIECES = {name: piece_type for piece_type, name in enumerate(PIECE_SHORT_NAMES) if piece_type != PAWN}
+SAN_PATTERN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+HEADER_PATTERN = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+TOKEN_PATTERN = re.compile(r"\{|\}|;|\(|\)|[^\s{};()]+")
+# move numbers with dots ("12.", "12...") or bare ("12"), castling may be written "0-0"
+MOVE_NUMBER_PATTERN = re.compile(r"^\d+(?:\.+|$)")
+
+Game = namedtuple("Game", ["headers", "moves", "result"])
+
+
+class PgnError(ValueError):
+    pass
+
+
+def read_games(lines):
+    """
+    Parses games from an iterable of PGN lines, e. g. an open file. Comments,
+    variations and numeric annotation glyphs are skipped.
+    :param lines: iterable of strings
+    :return: generator of Game tuples with the headers as dict, the SAN moves of
+             the main line as list and the result string
+    """
+    headers = {}
+    moves = []
+    comment_depth = 0
+    variation_depth = 0
+    for line in lines:
+        if not comment_depth and line.startswith("["):
+            match = HEADER_PATTERN.match(line)
+            if match:
+                if moves:
+                    # a new game starts without a result token at the end of the last one
+                    yield Game(headers, moves, headers.get("Result", "*"))
+                    headers, moves = {}, []
+                headers[match.group(1)] = match.group(2)
+                continue
+        if line.startswith("%"):
+            continue
+        for token in TOKEN_PATTERN.findall(line):
+            if comment_depth:
+                comment_depth -= token == "}"
+            elif token == "{":
+                comment_depth = 1
+            elif token == ";":
+                break
+            elif token == "(":
+                variation_depth += 1
+            elif token == ")":
+                variation_depth = max(variation_depth - 1, 0)
+            elif variation_depth or token.startswith("$"):
+                continue
+            elif token in RESULTS:
+                yield Game(headers, moves, token)
+                headers, moves = {}, []
+            else:
+                token = MOVE_NUMBER_PATTERN.sub("", token)
+                if token:
+                    moves.append(token)
+    if moves or headers:
+        yield Game(headers, moves, headers.get("Result", "*"))
+
+
+def read_pgn_file(path):
+    """
+    :param path: path of a PGN file
+    :return: generator of the Game tuples in the file, see read_games
+    """
+    with open(path, encoding="utf-8-sig", errors="replace") as file:
+        yield from read_games(file)
+
+
+def parse_san(board, san):
+    """
+    Resolves a move in Standard Algebraic Notation for the side to move
+    :param board: instance of class Board
+    :param san: move in SAN, e. g. "Nbd7", "exd5", "e8=Q+" or "O-O"
+    :return: move as integer
+    """
+    text = san.rstrip("+#!?")
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        king = board.bitboards[board.side * 6 + KING]
+        king_sq = lsb(king) if king else -1
+        to_sq = king_sq + 2 if len(text) == 3 else king_sq - 2
+        piece_type = KING
+        from_col = from_row = promotion = None
+        if to_sq not in CASTLING_ROOK_SQUARES:
+            raise PgnError(f"illegal move {san} in {board.to_fen()}")
+    else:
+        match = SAN_PATTERN.match(text)
+        if not match:
+            raise PgnError(f"cannot parse move {san}")
+        piece, from_col, from_row, target, promotion = match.groups()
+        piece_type = SAN_PIECES[piece] if piece else PAWN
+        to_sq = parse_square(target)
+        promotion = SAN_PIECES[promotion] if promotion else 0
+    candidates = []
+    for move in board.generate_legal_moves():
+        from_sq = move_from(move)
+        if move_target(move) != to_sq or board.squares[from_sq] % 6 != piece_type:
+            continue
+        if promotion is not None and move_promotion(move) != promotion:
+            continue
+        if from_col is not None and "abcdefgh"[from_sq & 7] != from_col:
+            continue
+        if from_row is not None and "12345678"[from_sq >> 3] != from_row:
+            continue
+        candidates.append(move)
+    if len(candidates) != 1:
+        raise PgnError(f"{'ambiguous' if candidates else 'illegal'} move {san} in {board.to_fen()}")
+    return candidates[0]
+
+
+def replay(game):
+    """
+    Plays the moves of a game on a board, starting from its FEN header if given.
+    The same board is changed in place, use board.copy() or board.pack() to keep
+    a position.
+    :param game: Game tuple as yielded by read_games
+    :return: generator of (board, move) with the position before each move and the
+             move played in it
+    """
+    board = Board.from_fen(game.headers.get("FEN", START_FEN))
+    for san in game.moves:
+        move = parse_san(board, san)
+        yield board, move
+        board.make_move(move)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="replay the games of PGN files")
+    parser.add_argument("paths", nargs="+", help="PGN files")
+    parser.add_argument("--limit", type=int, help="stop after this number of games")
+    parser.add_argument("--report", type=int, default=10000, help="games between progress lines")
+    args = parser.parse_args(argv)
+
+    games = positions = errors = 0
+    start = time.perf_counter()
+    for path in args.paths:
+        for game in read_pgn_file(path):
+            try:
+                for _ in replay(game):
+                    positions += 1
+            except PgnError as error:
+                errors += 1
+                print(f"game {games + 1}: {error}")
+            games += 1
+            if games % args.report == 0:
+                seconds = time.perf_counter() - start
+                print(f"games {games}  positions {positions}  {games / seconds:.0f} games/s")
+            if games == args.limit:
+                break
+        if games == args.limit:
+            break
+    seconds = time.perf_counter() - start
+    print(f"games {games}  positions {positions}  errors {errors}  time {seconds:.3f}s  "
+          f"{games / seconds if seconds > 0 else 0:.0f} games/s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,330 @@
+"""
+Negamax alpha-beta search with iterative deepening and aspiration windows.
+Scores are in centipawns from the point of view of the side to move.
+Moves are searched in the order: hash move, captures and promotions by MVV-LVA,
+killer moves, then the remaining quiet moves by their history score. At depth 0
+a quiescence search resolves captures; captures that lose material by static
+exchange evaluation (src.see) are skipped there.
+"""
+import time
+from collections import namedtuple
+from src.bitboard import lsb
+from src.board import NO_PIECE
+from src.transposition import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+from src.evaluation import evaluate, PIECE_CENTIPAWNS
+from src.pawns import PawnCache
+from src.see import see
+from game_params import PAWN, KING
+
+MATE_SCORE = 100000
+INFINITY = 1000000
+# scores above this bound are mate scores
+MATE_BOUND = MATE_SCORE - 1000
+MAX_PLY = 128
+ASPIRATION_WINDOW = 50
+# nodes between two checks of the clock
+CHECK_INTERVAL = 256
+# move ordering scores, each class of moves ranks above the next one
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24
+KILLER_SCORE = 1 << 20
+# history scores are halved when one of them reaches this limit
+HISTORY_LIMIT = KILLER_SCORE - 1
+
+SearchResult = namedtuple("SearchResult", ["move", "score", "pv", "depth", "nodes", "seconds", "nps"])
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def in_check(board):
+    """
+    :return: True, if the king of the side to move is attacked
+    """
+    king = board.bitboards[board.side * 6 + KING]
+    return bool(king) and board.attack_counts[board.side ^ 1][lsb(king)] > 0
+
+
+def score_to_tt(score, ply):
+    """
+    mate scores are stored relative to the position instead of the root
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class Searcher:
+    def __init__(self, tt_size_mb=16, tt=None, evaluator=None):
+        """
+        :param tt_size_mb: memory cap of the transposition table in megabytes
+        :param tt: optional TranspositionTable to use instead of a new one
+        :param evaluator: optional callable returning the score of a board in centipawns
+                          for the side to move, e. g. BatchEvaluator.score of src.nn;
+                          defaults to src.evaluation.evaluate
+        """
+        self.tt = tt if tt is not None else TranspositionTable(tt_size_mb)
+        self.pawn_cache = PawnCache()
+        self.evaluate = evaluator if evaluator is not None else self._evaluate_static
+        self.nodes = 0
+        self.node_limit = None
+        self.deadline = None
+        # pv[ply]: best line found from ply on in the current iteration
+        self.pv = [[] for _ in range(MAX_PLY + 1)]
+        self.previous_pv = []
+        # two quiet moves per ply that caused a beta cutoff
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        # history[piece][to_sq]: how often quiet moves of the piece to the square caused cutoffs
+        self.history = [[0] * 64 for _ in range(12)]
+
+    def search(self, board, max_depth=64, time_limit=None, node_limit=None, deadline=None,
+               start_depth=1):
+        """
+        Searches the position with iterative deepening until max_depth is reached or a
+        limit is hit. The board is restored to the root position in any case.
+        :param board: instance of class Board
+        :param max_depth: maximum depth in plies
+        :param time_limit: wall-clock budget in seconds
+        :param node_limit: maximum number of nodes
+        :param deadline: absolute time.perf_counter() value the search must not exceed
+        :param start_depth: depth of the first iteration
+        :return: SearchResult of the deepest completed iteration
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.node_limit = node_limit
+        self.deadline = deadline
+        if time_limit is not None:
+            self.deadline = start + time_limit if self.deadline is None \
+                else min(self.deadline, start + time_limit)
+        self.previous_pv = []
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self._age_history()
+        self.tt.new_search()
+        root_moves = board.generate_legal_moves()
+        best = SearchResult(root_moves[0] if root_moves else None, 0, root_moves[:1], 0, 0, 0.0, 0)
+        if len(root_moves) <= 1 and time_limit is not None:
+            return best
+
+        root_ply = len(board.history)
+        score = 0
+        for depth in range(min(start_depth, max_depth), max_depth + 1):
+            try:
+                score = self._aspiration(board, depth, score)
+            except SearchTimeout:
+                while len(board.history) > root_ply:
+                    board.unmake_move()
+                break
+            self.previous_pv = list(self.pv[0])
+            seconds = time.perf_counter() - start
+            best = SearchResult(self.previous_pv[0] if self.previous_pv else best.move, score,
+                                self.previous_pv, depth, self.nodes, seconds,
+                                int(self.nodes / seconds) if seconds > 0 else 0)
+            if abs(score) > MATE_BOUND:
+                break
+            # an iteration takes several times as long as the previous one
+            if self.deadline is not None and seconds > 0.5 * (self.deadline - start):
+                break
+        seconds = time.perf_counter() - start
+        return best._replace(nodes=self.nodes, seconds=seconds,
+                             nps=int(self.nodes / seconds) if seconds > 0 else 0)
+
+    def _evaluate_static(self, board):
+        return evaluate(board, self.pawn_cache)
+
+    def _aspiration(self, board, depth, previous_score):
+        """
+        searches with a narrow window around the previous score and widens it on failure
+        """
+        if depth < 3 or abs(previous_score) > MATE_BOUND:
+            return self._negamax(board, depth, -INFINITY, INFINITY, 0)
+        delta = ASPIRATION_WINDOW
+        alpha, beta = previous_score - delta, previous_score + delta
+        while True:
+            score = self._negamax(board, depth, alpha, beta, 0)
+            if score <= alpha:
+                alpha = max(score - delta, -INFINITY)
+            elif score >= beta:
+                beta = min(score + delta, INFINITY)
+            else:
+                return score
+            delta *= 4
+
+    def _count_node(self):
+        if self.nodes == self.node_limit:
+            raise SearchTimeout
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and self.deadline is not None \
+                and time.perf_counter() >= self.deadline:
+            raise SearchTimeout
+
+    def _order(self, board, moves, ply, hash_move):
+        """
+        sorts the moves by the ordering scores, the move of the previous principal
+        variation at this ply and the move from the transposition table first
+        :return: moves
+        """
+        pv_move = self.previous_pv[ply] if ply < len(self.previous_pv) else 0
+        killers = self.killers[ply]
+        squares = board.squares
+        history = self.history
+        ep_square = board.ep_square
+        scores = {}
+        for move in moves:
+            from_sq = move & 63
+            to_sq = (move >> 6) & 63
+            piece = squares[from_sq]
+            victim = squares[to_sq]
+            if move == hash_move:
+                scores[move] = HASH_MOVE_SCORE + 1
+            elif move == pv_move:
+                scores[move] = HASH_MOVE_SCORE
+            elif victim != NO_PIECE or move >> 12:
+                # most valuable victim first, least valuable attacker among equal victims
+                score = CAPTURE_SCORE + PIECE_CENTIPAWNS[move >> 12] if move >> 12 else CAPTURE_SCORE
+                if victim != NO_PIECE:
+                    score += 10 * PIECE_CENTIPAWNS[victim % 6] - PIECE_CENTIPAWNS[piece % 6]
+                scores[move] = score
+            elif to_sq == ep_square and piece % 6 == PAWN:
+                scores[move] = CAPTURE_SCORE + 9 * PIECE_CENTIPAWNS[PAWN]
+            elif move == killers[0]:
+                scores[move] = KILLER_SCORE + 1
+            elif move == killers[1]:
+                scores[move] = KILLER_SCORE
+            else:
+                scores[move] = history[piece][to_sq]
+        moves.sort(key=scores.__getitem__, reverse=True)
+        return moves
+
+    def _store_cutoff(self, board, move, depth, ply):
+        """
+        remembers a quiet move that caused a beta cutoff as killer and in the history
+        """
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        table = self.history[board.squares[move & 63]]
+        table[(move >> 6) & 63] += depth * depth
+        if table[(move >> 6) & 63] >= HISTORY_LIMIT:
+            self._age_history()
+
+    def _age_history(self):
+        for table in self.history:
+            for sq in range(64):
+                table[sq] >>= 1
+
+    def _quiescence(self, board, alpha, beta, ply, moves=None):
+        """
+        searches captures and promotions that do not lose material until the position
+        is quiet, all moves when in check
+        :param moves: legal moves of the position, if they are already generated
+        """
+        if moves is None:
+            self._count_node()
+            self.pv[ply] = []
+            moves = board.generate_legal_moves()
+            if not moves:
+                return -MATE_SCORE + ply if in_check(board) else 0
+        if ply >= MAX_PLY:
+            return self.evaluate(board)
+        if in_check(board):
+            best_score = -INFINITY
+        else:
+            best_score = self.evaluate(board)
+            if best_score >= beta:
+                return best_score
+            alpha = max(alpha, best_score)
+            squares = board.squares
+            tactical = []
+            for move in moves:
+                victim = squares[(move >> 6) & 63]
+                if victim == NO_PIECE and not move >> 12 \
+                        and not ((move >> 6) & 63 == board.ep_square and squares[move & 63] % 6 == PAWN):
+                    continue
+                # capturing a piece at least as valuable as the capturing one never loses
+                if victim != NO_PIECE and not move >> 12 \
+                        and PIECE_CENTIPAWNS[victim % 6] >= PIECE_CENTIPAWNS[squares[move & 63] % 6]:
+                    tactical.append(move)
+                elif see(board, move) >= 0:
+                    tactical.append(move)
+            moves = tactical
+        for move in self._order(board, moves, ply, 0):
+            board.make_move(move)
+            score = -self._quiescence(board, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        self._count_node()
+        self.pv[ply] = []
+        if ply and board.repetition_count():
+            return 0
+        key = board.zobrist_key
+        hash_move = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            hash_move, entry_depth, bound, score = entry
+            if ply and entry_depth >= depth:
+                score = score_from_tt(score, ply)
+                if bound == BOUND_EXACT or (bound == BOUND_LOWER and score >= beta) \
+                        or (bound == BOUND_UPPER and score <= alpha):
+                    return score
+        moves = board.generate_legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if in_check(board) else 0
+        if ply >= MAX_PLY:
+            return self.evaluate(board)
+        if depth <= 0:
+            return self._quiescence(board, alpha, beta, ply, moves)
+
+        alpha_original = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for move in self._order(board, moves, ply, hash_move):
+            board.make_move(move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv[ply] = [move] + self.pv[ply + 1]
+                    if alpha >= beta:
+                        to_sq = (move >> 6) & 63
+                        if board.squares[to_sq] == NO_PIECE and not move >> 12 and to_sq != board.ep_square:
+                            self._store_cutoff(board, move, depth, ply)
+                        break
+        if best_score >= beta:
+            bound = BOUND_LOWER
+        elif best_score > alpha_original:
+            bound = BOUND_EXACT
+        else:
+            bound = BOUND_UPPER
+        self.tt.store(key, best_move, depth, bound, score_to_tt(best_score, ply))
+        return best_score
+
+
+def search(board, max_depth=64, time_limit=None, node_limit=None):
+    """
+    searches the position of board with a new Searcher, see Searcher.search
+    """
+    return Searcher().search(board, max_depth, time_limit, node_limit)
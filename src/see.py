@@ -0,0 +1,83 @@
+"""
+Static exchange evaluation: the material balance of the sequence of captures on
+one square when both sides always recapture with their least valuable attacker
+and may stop capturing when that is better for them. Sliders behind a capturing
+piece join in as the occupancy shrinks, no moves are made on the board.
+"""
+from src.board import NO_PIECE
+from src.bitboard import SQUARE_BB
+from src.attacks import PAWN_ATTACKS, KNIGHT_ATTACKS, KING_ATTACKS, bishop_attacks, rook_attacks
+from src.evaluation import PIECE_CENTIPAWNS
+from src.move import move_from, move_target, move_promotion
+from game_params import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+
+def attackers(board, sq, occupied):
+    """
+    :param board: instance of class Board
+    :param sq: square index
+    :param occupied: occupancy used for the sliding pieces
+    :return: bitboard of the pieces of both colors on occupied attacking sq
+    """
+    bitboards = board.bitboards
+    diagonal = bishop_attacks(sq, occupied)
+    straight = rook_attacks(sq, occupied)
+    return ((PAWN_ATTACKS[1][sq] & bitboards[PAWN])
+            | (PAWN_ATTACKS[0][sq] & bitboards[6 + PAWN])
+            | (KNIGHT_ATTACKS[sq] & (bitboards[KNIGHT] | bitboards[6 + KNIGHT]))
+            | (KING_ATTACKS[sq] & (bitboards[KING] | bitboards[6 + KING]))
+            | (diagonal & (bitboards[BISHOP] | bitboards[6 + BISHOP]
+                           | bitboards[QUEEN] | bitboards[6 + QUEEN]))
+            | (straight & (bitboards[ROOK] | bitboards[6 + ROOK]
+                           | bitboards[QUEEN] | bitboards[6 + QUEEN]))) & occupied
+
+
+def see(board, move):
+    """
+    :param board: instance of class Board, the move is one of the side to move
+    :param move: capture or promotion as integer, see src.move
+    :return: expected material gain of the move in centipawns, negative if it loses material
+    """
+    from_sq = move_from(move)
+    to_sq = move_target(move)
+    promotion = move_promotion(move)
+    bitboards = board.bitboards
+    piece = board.squares[from_sq]
+    side = piece // 6
+    occupied = board.occupied ^ SQUARE_BB[from_sq]
+    victim = board.squares[to_sq]
+    if victim != NO_PIECE:
+        gain = PIECE_CENTIPAWNS[victim % 6]
+    elif piece % 6 == PAWN and to_sq == board.ep_square:
+        gain = PIECE_CENTIPAWNS[PAWN]
+        occupied ^= SQUARE_BB[to_sq ^ 8]
+    else:
+        gain = 0
+    on_square = piece % 6
+    if promotion:
+        gain += PIECE_CENTIPAWNS[promotion] - PIECE_CENTIPAWNS[PAWN]
+        on_square = promotion
+    gains = [gain]
+    side ^= 1
+    current = attackers(board, to_sq, occupied)
+    while True:
+        own = current & board.occupancy[side] & occupied
+        if not own:
+            break
+        for piece_type in range(6):
+            candidates = own & bitboards[side * 6 + piece_type]
+            if candidates:
+                break
+        if piece_type == KING and current & board.occupancy[side ^ 1] & occupied:
+            # the king cannot capture into an attacked square
+            break
+        # capturing the piece on the square, which the opponent may answer in turn
+        gains.append(PIECE_CENTIPAWNS[on_square] - gains[-1])
+        occupied ^= candidates & -candidates
+        on_square = piece_type
+        current = attackers(board, to_sq, occupied)
+        side ^= 1
+    # each side only continues the exchange if that is better than stopping
+    for index in range(len(gains) - 1, 0, -1):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+    return gains[0]
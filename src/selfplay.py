@@ -0,0 +1,333 @@
+"""
+Headless self-play: worker processes play games with a move policy and send the
+records of each finished game through a bounded queue to the main process, which
+writes them to shard files (see src.dataset). Workers block while the queue is
+full, so memory stays constant however many games are played.
+Usage:
+    python -m src.selfplay 1000 data/selfplay [--policy random|search|mcts] [--workers N]
+"""
+import argparse
+import os
+import random
+import time
+import multiprocessing
+import numpy as np
+from src.board import Board
+from src.dataset import RECORD_DTYPE, ShardWriter
+from src.features import encode_boards
+from src.mcts import MCTS
+from src.book import OpeningBook
+from src.nn import ValueNetwork
+from src.search import Searcher, in_check
+from game_params import START_FEN, WHITE, PAWN, ROOK, QUEEN
+
+# plies after which a game is adjudicated a draw
+MAX_PLIES = 400
+
+
+class RandomPolicy:
+    """
+    plays a uniformly random legal move
+    """
+    def __call__(self, board, moves, rng):
+        return rng.choice(moves)
+
+
+class SearchPolicy:
+    def __init__(self, max_depth=2, node_limit=None, time_limit=None, tt_size_mb=4):
+        """
+        plays the best move of an alpha-beta search, see src.search
+        :param max_depth: search depth in plies
+        :param node_limit: optional maximum number of nodes per move
+        :param time_limit: optional wall-clock budget per move in seconds
+        :param tt_size_mb: memory cap of the transposition table of each worker
+        """
+        self.max_depth = max_depth
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.tt_size_mb = tt_size_mb
+        self._searcher = None
+
+    def __getstate__(self):
+        # every worker process builds its own searcher
+        return dict(self.__dict__, _searcher=None)
+
+    def __call__(self, board, moves, rng):
+        if self._searcher is None:
+            self._searcher = Searcher(self.tt_size_mb)
+        return self._searcher.search(board, self.max_depth, self.time_limit, self.node_limit).move
+
+
+class MCTSPolicy:
+    def __init__(self, simulations=200, temperature=0.0, value_fn=None, prior_fn=None, **options):
+        """
+        plays the most visited move of a Monte Carlo tree search, see src.mcts. The tree is
+        kept between the calls of a game and continued from the subtree of the moves played.
+        :param simulations: number of simulations per move
+        :param temperature: 0 for the most visited move, otherwise moves are sampled by visits
+        :param value_fn: optional picklable value function of the tree search
+        :param prior_fn: optional picklable prior function of the tree search
+        :param options: further keyword arguments of MCTS
+        """
+        self.simulations = simulations
+        self.temperature = temperature
+        self.value_fn = value_fn
+        self.prior_fn = prior_fn
+        self.options = options
+        self._tree = None
+
+    def __getstate__(self):
+        return dict(self.__dict__, _tree=None)
+
+    def __call__(self, board, moves, rng):
+        tree = self._tree
+        known = len(tree.board.history) if tree is not None else 0
+        if (tree is None or len(board.history) < known
+                or (len(board.history) > known and board.history[known][6] != tree.board.zobrist_key)
+                or (len(board.history) == known and board.zobrist_key != tree.board.zobrist_key)):
+            tree = self._tree = MCTS(board, self.value_fn, self.prior_fn, **self.options)
+        else:
+            for record in board.history[known:]:
+                tree.advance(record[0])
+        tree.search(self.simulations)
+        move = tree.best_move(self.temperature, np.random.default_rng(rng.getrandbits(64)))
+        tree.advance(move)
+        return move
+
+
+class BookPolicy:
+    def __init__(self, path, policy):
+        """
+        plays a weighted random move of an opening book while the position is in it
+        :param path: book file, see src.book
+        :param policy: policy for the positions out of the book
+        """
+        self.path = path
+        self.policy = policy
+        self._book = None
+
+    def __getstate__(self):
+        # every worker process maps the book itself
+        return dict(self.__dict__, _book=None)
+
+    def __call__(self, board, moves, rng):
+        if self._book is None:
+            self._book = OpeningBook(self.path)
+        move = self._book.choose(board, rng)
+        return move if move in moves else self.policy(board, moves, rng)
+
+
+class ModelPolicy:
+    def __init__(self, model, temperature=0.0):
+        """
+        plays the move to the position the model rates worst for the opponent
+        :param model: picklable callable mapping feature planes of shape (N, planes, 8, 8),
+                      see src.features, to N values for the side to move
+        :param temperature: 0 for the best move, otherwise moves are sampled with
+                            probabilities softmax(-value / temperature)
+        """
+        self.model = model
+        self.temperature = temperature
+
+    def __call__(self, board, moves, rng):
+        children = []
+        for move in moves:
+            board.make_move(move)
+            children.append(board.copy())
+            board.unmake_move()
+        values = -np.asarray(self.model(encode_boards(children)), dtype=np.float64).reshape(-1)
+        if not self.temperature:
+            return moves[int(np.argmax(values))]
+        weights = np.exp((values - values.max()) / self.temperature)
+        return rng.choices(moves, weights=weights)[0]
+
+
+def game_result(board, moves, max_plies=MAX_PLIES):
+    """
+    :param board: instance of class Board
+    :param moves: legal moves of the side to move
+    :param max_plies: number of plies after which the game is a draw
+    :return: None if the game goes on, otherwise 1 if white won, -1 if black won, 0 for a draw
+    """
+    if not moves:
+        if in_check(board):
+            return -1 if board.side == WHITE else 1
+        return 0
+    if board.halfmove_clock >= 100 or board.repetition_count() >= 2 or len(board.history) >= max_plies:
+        return 0
+    bitboards = board.bitboards
+    heavy = 0
+    for piece_type in (PAWN, ROOK, QUEEN):
+        heavy |= bitboards[piece_type] | bitboards[6 + piece_type]
+    if not heavy and board.occupied.bit_count() <= 3:
+        # kings and at most one minor piece
+        return 0
+    return None
+
+
+def play_game(policy, rng, fen=START_FEN, max_plies=MAX_PLIES, random_plies=0):
+    """
+    Plays one game of the policy against itself
+    :param policy: callable (board, moves, rng) -> move
+    :param rng: instance of random.Random
+    :param fen: start position
+    :param max_plies: number of plies after which the game is a draw
+    :param random_plies: number of plies at the start played randomly for varied openings
+    :return: array of RECORD_DTYPE with one record per position of the game
+    """
+    board = Board.from_fen(fen)
+    positions = []
+    played = []
+    while True:
+        moves = board.generate_legal_moves()
+        result = game_result(board, moves, max_plies)
+        if result is not None:
+            break
+        move = rng.choice(moves) if len(played) < random_plies else policy(board, moves, rng)
+        positions.append(board.pack())
+        played.append(move)
+        board.make_move(move)
+    records = np.zeros(len(played), dtype=RECORD_DTYPE)
+    if played:
+        records["position"] = np.frombuffer(b"".join(positions), dtype=np.uint8).reshape(len(played), -1)
+        records["move"] = played
+        sides = records["position"][:, 24] & 1
+        # the result from the point of view of the side to move in each position
+        records["result"] = np.where(sides == WHITE, result, -result)
+    return records
+
+
+def _worker(worker_id, games, policy, seed, max_plies, random_plies, queue):
+    """
+    plays games and puts (worker_id, record bytes, seconds, error) for each game and
+    (worker_id, None, seconds, error) when done
+    """
+    start = time.perf_counter()
+    try:
+        rng = random.Random(seed * 1000003 + worker_id)
+        for _ in range(games):
+            records = play_game(policy, rng, max_plies=max_plies, random_plies=random_plies)
+            queue.put((worker_id, records.tobytes(), time.perf_counter() - start, None))
+    except Exception as error:
+        queue.put((worker_id, None, time.perf_counter() - start, repr(error)))
+        return
+    queue.put((worker_id, None, time.perf_counter() - start, None))
+
+
+def run_self_play(games, directory, policy=None, workers=None, queue_size=64,
+                  records_per_shard=1 << 20, max_plies=MAX_PLIES, random_plies=0, seed=0,
+                  report=None):
+    """
+    Plays games in worker processes and writes their records to shards
+    :param games: total number of games
+    :param directory: output directory of the shards
+    :param policy: picklable move policy, defaults to RandomPolicy
+    :param workers: number of worker processes, defaults to the number of cores
+    :param queue_size: maximum number of finished games waiting to be written
+    :param records_per_shard: maximum number of records per shard file
+    :param random_plies: number of random plies at the start of each game
+    :param seed: seed of the random number generators of the workers
+    :param report: optional callable receiving the statistics after each game
+    :return: dict with games, positions, seconds, games_per_second, the games per
+             second of each worker and the paths of the shards
+    """
+    policy = policy or RandomPolicy()
+    workers = min(workers or os.cpu_count() or 1, games) or 1
+    queue = multiprocessing.Queue(queue_size)
+    processes = [multiprocessing.Process(
+        target=_worker, daemon=True,
+        args=(worker_id, games // workers + (worker_id < games % workers), policy, seed,
+              max_plies, random_plies, queue))
+        for worker_id in range(workers)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    worker_games = [0] * workers
+    worker_seconds = [0.0] * workers
+    stats = {"games": 0, "positions": 0}
+    running = workers
+    try:
+        with ShardWriter(directory, records_per_shard) as writer:
+            while running:
+                worker_id, data, seconds, error = queue.get()
+                if error is not None:
+                    raise RuntimeError(f"self-play worker {worker_id} failed: {error}")
+                worker_seconds[worker_id] = seconds
+                if data is None:
+                    running -= 1
+                    continue
+                records = np.frombuffer(data, dtype=RECORD_DTYPE)
+                writer.write(records)
+                worker_games[worker_id] += 1
+                stats["games"] += 1
+                stats["positions"] += len(records)
+                if report is not None:
+                    report(_statistics(stats, start, worker_games, worker_seconds, writer.shards))
+    finally:
+        for process in processes:
+            if running:
+                process.terminate()
+            process.join()
+    return _statistics(stats, start, worker_games, worker_seconds, writer.shards)
+
+
+def _statistics(stats, start, worker_games, worker_seconds, shards):
+    seconds = time.perf_counter() - start
+    return dict(stats, seconds=seconds,
+                games_per_second=stats["games"] / seconds if seconds > 0 else 0.0,
+                worker_games_per_second=[games / busy if busy > 0 else 0.0
+                                         for games, busy in zip(worker_games, worker_seconds)],
+                shards=list(shards))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="generate training games by self-play")
+    parser.add_argument("games", type=int)
+    parser.add_argument("directory", help="output directory of the shards")
+    parser.add_argument("--policy", choices=("random", "search", "mcts", "model"),
+                        default="random")
+    parser.add_argument("--depth", type=int, default=2, help="search depth of the search policy")
+    parser.add_argument("--simulations", type=int, default=200,
+                        help="simulations per move of the mcts policy")
+    parser.add_argument("--model", help="weights of the model policy, see src.nn.ValueNetwork.save")
+    parser.add_argument("--temperature", type=float, default=0.0,
+                        help="sampling temperature of the model policy")
+    parser.add_argument("--book", help="opening book file, see src.book")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--records-per-shard", type=int, default=1 << 20)
+    parser.add_argument("--random-plies", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=int, default=100, help="games between progress lines")
+    args = parser.parse_args(argv)
+
+    if args.policy == "model" and not args.model:
+        parser.error("--policy model requires --model")
+    if args.policy == "search":
+        policy = SearchPolicy(args.depth)
+    elif args.policy == "mcts":
+        policy = MCTSPolicy(args.simulations)
+    elif args.policy == "model":
+        policy = ModelPolicy(ValueNetwork.load(args.model), args.temperature)
+    else:
+        policy = RandomPolicy()
+    if args.book:
+        policy = BookPolicy(args.book, policy)
+
+    def report(stats):
+        if stats["games"] % args.report == 0:
+            print(f"games {stats['games']}  positions {stats['positions']}  "
+                  f"{stats['games_per_second']:.1f} games/s")
+
+    stats = run_self_play(args.games, args.directory, policy, args.workers, args.queue_size,
+                          args.records_per_shard, random_plies=args.random_plies, seed=args.seed,
+                          report=report)
+    print(f"games {stats['games']}  positions {stats['positions']}  time {stats['seconds']:.3f}s  "
+          f"{stats['games_per_second']:.1f} games/s  shards {len(stats['shards'])}")
+    for worker_id, rate in enumerate(stats["worker_games_per_second"]):
+        print(f"worker {worker_id}: {rate:.1f} games/s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""
+Fixed-size transposition table keyed by Zobrist keys.
+The table is one flat buffer of unsigned 64-bit words. Each bucket holds two
+entries of two words (key, data): the first entry is replaced only by deeper
+searches or entries of a newer search, the second one is always replaced.
+The data word packs the move (bits 0-15), bound (16-17), depth (18-25), search
+age (26-31) and the score plus SCORE_OFFSET (32-63). The key word stores
+key ^ data, so an entry torn by concurrent writers of a shared table fails
+the key check instead of returning data of another position.
+"""
+BOUND_EXACT = 1
+BOUND_LOWER = 2
+BOUND_UPPER = 3
+SCORE_OFFSET = 1 << 31
+BUCKET_BYTES = 32
+WORDS_PER_BUCKET = 4
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16, buffer=None):
+        """
+        :param size_mb: memory cap in megabytes, rounded down to a power of two buckets
+        :param buffer: optional writable buffer to keep the table in, e. g. shared memory
+        """
+        self.bucket_count = self.size_for(size_mb) // BUCKET_BYTES
+        if buffer is None:
+            buffer = bytearray(self.bucket_count * BUCKET_BYTES)
+        self.buffer = buffer
+        self.slots = memoryview(buffer).cast("B")[:self.bucket_count * BUCKET_BYTES].cast("Q")
+        self.mask = self.bucket_count - 1
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    @staticmethod
+    def size_for(size_mb):
+        """
+        :return: number of bytes a table with the memory cap size_mb uses
+        """
+        buckets = max(1, int(size_mb * 1024 * 1024) // BUCKET_BYTES)
+        return (1 << (buckets.bit_length() - 1)) * BUCKET_BYTES
+
+    @property
+    def size_bytes(self):
+        return self.bucket_count * BUCKET_BYTES
+
+    @property
+    def hit_rate(self):
+        """
+        share of probes that found an entry of the probed position
+        """
+        return self.hits / self.probes if self.probes else 0.0
+
+    def new_search(self):
+        """
+        starts a new search: entries of older searches may be replaced by any depth
+        """
+        self.age = (self.age + 1) & 63
+
+    def clear(self):
+        self.slots[:] = memoryview(bytes(self.size_bytes)).cast("Q")
+        self.probes = self.hits = self.stores = 0
+
+    def probe(self, key):
+        """
+        :param key: Zobrist key of the position
+        :return: (move, depth, bound, score) of the stored entry or None
+        """
+        self.probes += 1
+        slots = self.slots
+        index = (key & self.mask) * WORDS_PER_BUCKET
+        data = slots[index + 1]
+        if slots[index] ^ data != key:
+            data = slots[index + 3]
+            if slots[index + 2] ^ data != key:
+                return None
+        if not data:
+            return None
+        self.hits += 1
+        return data & 0xFFFF, (data >> 18) & 0xFF, (data >> 16) & 3, (data >> 32) - SCORE_OFFSET
+
+    def store(self, key, move, depth, bound, score):
+        """
+        :param key: Zobrist key of the position
+        :param move: best move found, 0 if none
+        :param depth: remaining depth the position was searched with
+        :param bound: BOUND_EXACT, BOUND_LOWER or BOUND_UPPER
+        :param score: score of the position
+        """
+        self.stores += 1
+        slots = self.slots
+        index = (key & self.mask) * WORDS_PER_BUCKET
+        data = (move | (bound << 16) | (min(depth, 255) << 18) | (self.age << 26)
+                | ((score + SCORE_OFFSET) << 32))
+        stored = slots[index + 1]
+        same_key = slots[index] ^ stored == key
+        if (same_key or not stored or depth >= (stored >> 18) & 0xFF
+                or (stored >> 26) & 63 != self.age):
+            if not same_key and stored:
+                # the displaced entry gets the always-replace slot
+                slots[index + 2] = slots[index]
+                slots[index + 3] = stored
+            slots[index] = key ^ data
+            slots[index + 1] = data
+        else:
+            slots[index + 2] = key ^ data
+            slots[index + 3] = data
+
+    def usage(self, sample=1000):
+        """
+        :return: share of entries used by the current search, estimated from the first buckets
+        """
+        sample = min(sample, self.bucket_count)
+        used = 0
+        for index in range(0, sample * WORDS_PER_BUCKET, 2):
+            data = self.slots[index + 1]
+            used += bool(data) and (data >> 26) & 63 == self.age
+        return used / (2 * sample)
+
+    def stats(self):
+        return {"size_bytes": self.size_bytes, "probes": self.probes, "hits": self.hits,
+                "stores": self.stores, "hit_rate": self.hit_rate, "usage": self.usage()}
@@ -0,0 +1,48 @@
+"""
+Zobrist keys: a 64-bit position key is the xor of one random number per
+(piece, square), one for black to move, one per castling rights combination
+and one per en passant file. Board keeps its key up to date incrementally.
+The pawn key only covers pawns and kings, the pieces the pawn structure terms of
+the evaluation depend on.
+"""
+import random
+from src.bitboard import iter_squares
+from game_params import PAWN, KING
+
+_random = random.Random(0x5EED)
+PIECE_KEYS = tuple(tuple(_random.getrandbits(64) for _ in range(64)) for _ in range(12))
+SIDE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = tuple(_random.getrandbits(64) for _ in range(16))
+EP_KEYS = tuple(_random.getrandbits(64) for _ in range(8))
+# PAWN_KEYS[piece][sq]: share of the piece on the square in the pawn key, 0 for other pieces
+PAWN_KEYS = tuple(PIECE_KEYS[piece] if piece % 6 in (PAWN, KING) else (0,) * 64 for piece in range(12))
+
+
+def compute_key(board):
+    """
+    computes the Zobrist key of a board from scratch
+    :param board: instance of class Board
+    :return: 64-bit key as integer
+    """
+    key = CASTLING_KEYS[board.castling]
+    for piece, bb in enumerate(board.bitboards):
+        for sq in iter_squares(bb):
+            key ^= PIECE_KEYS[piece][sq]
+    if board.side:
+        key ^= SIDE_KEY
+    if board.ep_square is not None:
+        key ^= EP_KEYS[board.ep_square & 7]
+    return key
+
+
+def compute_pawn_key(board):
+    """
+    computes the pawn key of a board from scratch
+    :param board: instance of class Board
+    :return: 64-bit key as integer
+    """
+    key = 0
+    for piece, bb in enumerate(board.bitboards):
+        for sq in iter_squares(bb):
+            key ^= PAWN_KEYS[piece][sq]
+    return key
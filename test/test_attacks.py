@@ -0,0 +1,39 @@
+import unittest
+from src.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, \
+    rook_attacks, bishop_attacks
+from src.bitboard import parse_square, popcount, SQUARE_BB
+from game_params import WHITE, BLACK
+
+
+def bb(*fields):
+    result = 0
+    for field in fields:
+        result |= SQUARE_BB[parse_square(field)]
+    return result
+
+
+class TestAttacks(unittest.TestCase):
+    def test_step_tables(self):
+        self.assertEqual(bb("b3", "c2"), KNIGHT_ATTACKS[parse_square("a1")])
+        self.assertEqual(8, popcount(KNIGHT_ATTACKS[parse_square("e4")]))
+        self.assertEqual(3, popcount(KING_ATTACKS[parse_square("h8")]))
+        self.assertEqual(bb("d5", "f5"), PAWN_ATTACKS[WHITE][parse_square("e4")])
+        self.assertEqual(bb("b3"), PAWN_ATTACKS[BLACK][parse_square("a4")])
+
+    def test_rook_attacks_stop_at_first_blocker(self):
+        occupied = bb("e6", "e7", "c4", "e2")
+        expected = bb("e5", "e6", "d4", "c4", "f4", "g4", "h4", "e3", "e2")
+        self.assertEqual(expected, rook_attacks(parse_square("e4"), occupied))
+
+    def test_bishop_attacks_empty_board(self):
+        self.assertEqual(7, popcount(bishop_attacks(parse_square("a1"), 0)))
+        self.assertEqual(13, popcount(bishop_attacks(parse_square("d4"), 0)))
+
+    def test_between(self):
+        self.assertEqual(bb("b2", "c3"), BETWEEN[parse_square("a1")][parse_square("d4")])
+        self.assertEqual(bb("e2", "e3"), BETWEEN[parse_square("e4")][parse_square("e1")])
+        self.assertEqual(0, BETWEEN[parse_square("a1")][parse_square("b3")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from src.bitboard import square, parse_square, square_name, iter_squares, lsb, msb, popcount
+from src.figure import Rook, King, Bishop
+from src.board import Board
+from game_setup import FIGURES
+from game_params import WHITE, BLACK, PAWN, KING
+
+
+class TestBitboard(unittest.TestCase):
+    def test_square_names(self):
+        self.assertEqual(0, parse_square("a1"))
+        self.assertEqual(63, parse_square("h8"))
+        self.assertEqual(square(3, 4), parse_square("e4"))
+        self.assertEqual("e4", square_name(parse_square("e4")))
+
+    def test_bit_helpers(self):
+        bb = (1 << 3) | (1 << 17) | (1 << 63)
+        self.assertEqual([3, 17, 63], list(iter_squares(bb)))
+        self.assertEqual(3, lsb(bb))
+        self.assertEqual(63, msb(bb))
+        self.assertEqual(3, popcount(bb))
+
+    def test_initial_bitboards(self):
+        board = Board(FIGURES)
+        self.assertEqual(0xFF00, board.bitboards[WHITE * 6 + PAWN])
+        self.assertEqual(0xFF << 48, board.bitboards[BLACK * 6 + PAWN])
+        self.assertEqual(1 << parse_square("e8"), board.bitboards[BLACK * 6 + KING])
+        self.assertEqual(0xFFFF, board.occupancy[WHITE])
+        self.assertEqual(0xFFFF00000000FFFF, board.occupied)
+
+    def test_rook_blocked_horizontally(self):
+        board = Board([King("e1", "white"), Bishop("c4", "black"), King("e8", "black")])
+        piece = Rook("e4", "white")
+        piece.get_legal_moves(board)
+        self.assertNotIn((0, -3), piece.legal_moves)
+        self.assertNotIn((0, -3), piece.legal_capture_moves)
+        self.assertIn((0, -2), piece.legal_capture_moves)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,298 @@
+import unittest
+import copy
+import random
+from src.figure import Pawn, Knight, Bishop, Rook, Queen, King
+from src.board import Board, BLACK_KINGSIDE, BLACK_QUEENSIDE, NO_PIECE, PACKED_SIZE
+from src.move import parse_move, move_name
+from src.bitboard import parse_square, iter_squares
+from src.attacks import piece_attacks
+from src.perft import STANDARD_POSITIONS
+from game_setup import FIGURES
+from game_params import WHITE, BLACK, COLORS, PAWN, KNIGHT, BISHOP, START_FEN
+
+
+class TestMakeMove(unittest.TestCase):
+    def setUp(self):
+        self.board = Board(copy.deepcopy(FIGURES))
+
+    def snapshot(self, board):
+        return list(board.bitboards), list(board.occupancy), board.occupied, board.side
+
+    def test_parse_move(self):
+        self.assertEqual("g1f3", move_name(parse_move("g1f3")))
+
+    def test_make_move(self):
+        self.board.make_move(parse_move("e2e4"))
+        self.assertEqual(WHITE * 6 + PAWN, self.board.piece_at(parse_square("e4")))
+        self.assertIsNone(self.board.piece_at(parse_square("e2")))
+        self.assertEqual("black", self.board.turn)
+
+    def test_make_unmake_restores_position(self):
+        expected = self.snapshot(self.board)
+        for move in ["e2e4", "d7d5", "e4d5", "d8d5"]:
+            self.board.make_move(parse_move(move))
+        self.assertEqual(BLACK * 6 + 4, self.board.piece_at(parse_square("d5")))
+        for _ in range(4):
+            self.board.unmake_move()
+        self.assertEqual(expected, self.snapshot(self.board))
+        self.assertEqual([], self.board.history)
+
+    def test_unmake_restores_captured_piece(self):
+        board = Board([King("e1", "white"), King("e8", "black"),
+                       Knight("c3", "white"), Bishop("d5", "black")])
+        board.make_move(parse_move("c3d5"))
+        self.assertEqual(0, board.bitboards[BLACK * 6 + BISHOP])
+        board.unmake_move()
+        self.assertEqual(BLACK * 6 + BISHOP, board.piece_at(parse_square("d5")))
+        self.assertEqual(WHITE * 6 + KNIGHT, board.piece_at(parse_square("c3")))
+
+    def test_figures_follow_make_move(self):
+        self.board.make_move(parse_move("g1f3"))
+        knights = [figure for figure in self.board.figures
+                   if isinstance(figure, Knight) and figure.color == "white"]
+        self.assertEqual({(0, 1), (2, 5)}, {(k.field_row, k.field_col) for k in knights})
+
+    def test_move_to_keeps_figures(self):
+        pawn = self.board.figures[4]
+        figures = self.board.figures
+        self.assertEqual((True, "legal move carried out"), pawn.move_to(self.board, "e4", "white"))
+        self.assertIs(figures, self.board.figures)
+        self.assertEqual(WHITE * 6 + PAWN, self.board.piece_at(parse_square("e4")))
+
+    def test_move_to_off_board_figure(self):
+        pawn = Pawn("e3", "white")
+        output = pawn.move_to(self.board, "e4", "white")
+        self.assertEqual((False, "illegal move: wp is not on the board"), output)
+
+
+class TestGenerateLegalMoves(unittest.TestCase):
+    def names(self, board, color=None):
+        return {move_name(move) for move in board.generate_legal_moves(color)}
+
+    def test_initial_position(self):
+        board = Board(copy.deepcopy(FIGURES))
+        self.assertEqual(20, len(board.generate_legal_moves("white")))
+        self.assertEqual(20, len(board.generate_legal_moves("black")))
+
+    def test_pinned_piece_moves_along_pin(self):
+        board = Board([King("e1", "white"), Rook("e4", "white"), Bishop("a3", "white"),
+                       Rook("e8", "black"), King("a8", "black")])
+        rook_moves = {name for name in self.names(board) if name.startswith("e4")}
+        self.assertEqual({"e4e2", "e4e3", "e4e5", "e4e6", "e4e7", "e4e8"}, rook_moves)
+
+    def test_check_evasions(self):
+        board = Board([King("e1", "white"), Knight("c5", "white"),
+                       Queen("e7", "black"), King("a8", "black")])
+        expected = {"e1d1", "e1d2", "e1f1", "e1f2", "c5e4", "c5e6"}
+        self.assertEqual(expected, self.names(board))
+
+    def test_double_check_only_king_moves(self):
+        board = Board([King("e1", "white"), Rook("a2", "white"),
+                       Rook("e7", "black"), Knight("d3", "black"), King("a8", "black")])
+        self.assertEqual({"e1d1", "e1d2", "e1f1"}, self.names(board))
+
+    def test_king_cannot_step_along_checking_ray(self):
+        board = Board([King("e4", "white"), Rook("e8", "black"), King("a8", "black")])
+        self.assertNotIn("e4e3", self.names(board))
+        self.assertIn("e4d3", self.names(board))
+
+    def test_en_passant_only_for_side_to_move(self):
+        board = Board.from_fen("4k3/8/8/8/3p4/8/4PP2/4K3 w - - 0 1")
+        board.make_move(parse_move("e2e4"))
+        self.assertIn("d4e3", self.names(board))
+        self.assertNotIn("f2e3", self.names(board, "white"))
+
+
+class TestMailbox(unittest.TestCase):
+    def assertMailboxMatches(self, board):
+        squares = bytearray([NO_PIECE] * 64)
+        for piece, bb in enumerate(board.bitboards):
+            for sq in iter_squares(bb):
+                squares[sq] = piece
+        self.assertEqual(squares, board.squares)
+
+    def test_mailbox_follows_moves_and_unmoves(self):
+        board = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        initial = board.squares[:]
+        for move in ["e1g1", "h3g2", "d5e6", "g2f1q", "a2a4", "b4a3"]:
+            board.make_move(parse_move(move))
+            self.assertMailboxMatches(board)
+        for _ in range(6):
+            board.unmake_move()
+        self.assertEqual(initial, board.squares)
+
+    def test_piece_at(self):
+        board = Board(copy.deepcopy(FIGURES))
+        self.assertEqual(WHITE * 6 + KNIGHT, board.piece_at(parse_square("b1")))
+        self.assertIsNone(board.piece_at(parse_square("e4")))
+
+    def test_figures_have_no_instance_dict(self):
+        for figure in FIGURES:
+            self.assertFalse(hasattr(figure, "__dict__"))
+
+
+class TestCheckDetection(unittest.TestCase):
+    def test_agrees_with_attack_counts(self):
+        rng = random.Random(9)
+        for _, fen, _ in STANDARD_POSITIONS:
+            board = Board.from_fen(fen)
+            for _ in range(20):
+                for color in (WHITE, BLACK):
+                    for sq in range(64):
+                        self.assertEqual(board.attack_counts[color][sq] > 0,
+                                         board.is_square_attacked(sq, COLORS[color]), (fen, sq))
+                moves = board.generate_legal_moves()
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+
+    def test_square_names(self):
+        board = Board.from_fen(START_FEN)
+        self.assertTrue(board.is_square_attacked("f3", "white"))
+        self.assertFalse(board.is_square_attacked("e4", "white"))
+        self.assertTrue(board.is_square_attacked("d6", "black"))
+
+    def test_is_in_check(self):
+        board = Board.from_fen("4k3/8/8/1B6/8/8/8/4K3 b - - 0 1")
+        self.assertTrue(board.is_in_check("black"))
+        self.assertFalse(board.is_in_check("white"))
+        board = Board.from_fen("4k3/3p4/8/1B6/8/8/8/4K3 b - - 0 1")
+        self.assertFalse(board.is_in_check("black"))
+
+
+class TestAttackCounts(unittest.TestCase):
+    def recount(self, board):
+        counts = [bytearray(64), bytearray(64)]
+        for piece, bb in enumerate(board.bitboards):
+            for sq in iter_squares(bb):
+                for target in iter_squares(piece_attacks(piece % 6, piece // 6, sq, board.occupied)):
+                    counts[piece // 6][target] += 1
+        return counts
+
+    def test_initial_counts(self):
+        board = Board(copy.deepcopy(FIGURES))
+        self.assertEqual(4, board.attack_counts[WHITE][parse_square("d2")])
+        self.assertEqual(0, board.attack_counts[WHITE][parse_square("e4")])
+        self.assertEqual(self.recount(board), board.attack_counts)
+
+    def test_counts_follow_moves_and_unmoves(self):
+        board = Board(copy.deepcopy(FIGURES))
+        initial = [counts[:] for counts in board.attack_counts]
+        for move in ["e2e4", "d7d5", "e4d5", "d8d5", "b1c3", "d5a5", "f1b5", "c7c6"]:
+            board.make_move(parse_move(move))
+            self.assertEqual(self.recount(board), board.attack_counts)
+        for _ in range(8):
+            board.unmake_move()
+        self.assertEqual(initial, board.attack_counts)
+
+    def test_covered_squares_do_not_grow(self):
+        board = Board(copy.deepcopy(FIGURES))
+        board.get_covered_squares("white")
+        board.get_covered_squares("black")
+        self.assertEqual({(5, col) for col in range(8)}, board.covered_squares)
+        self.assertTrue(board.is_covered(5, 0, "black"))
+        self.assertFalse(board.is_covered(6, 0, "black"))
+
+    def test_king_in_check_after_discovered_attack(self):
+        board = Board([King("e1", "white"), Knight("e4", "black"),
+                       Rook("e8", "black"), King("a8", "black")])
+        board.king_in_check("white")
+        self.assertEqual("None", board.in_check)
+        board.side = BLACK
+        board.make_move(parse_move("e4c3"))
+        board.king_in_check("white")
+        self.assertEqual("white", board.in_check)
+
+
+class TestSpecialMoves(unittest.TestCase):
+    def names(self, board):
+        return {move_name(move) for move in board.generate_legal_moves()}
+
+    def test_castling(self):
+        board = Board.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+        self.assertTrue({"e1g1", "e1c1"} <= self.names(board))
+        board.make_move(parse_move("e1g1"))
+        self.assertEqual(WHITE * 6 + 3, board.piece_at(parse_square("f1")))
+        self.assertEqual(BLACK_KINGSIDE | BLACK_QUEENSIDE, board.castling)
+        board.unmake_move()
+        self.assertEqual(WHITE * 6 + 3, board.piece_at(parse_square("h1")))
+        self.assertEqual(15, board.castling)
+
+    def test_no_castling_through_attacked_square(self):
+        board = Board.from_fen("r3k2r/8/8/8/8/8/5r2/R3K2R w KQkq - 0 1")
+        self.assertNotIn("e1g1", self.names(board))
+        self.assertIn("e1c1", self.names(board))
+
+    def test_en_passant(self):
+        board = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        self.assertIn("e5d6", self.names(board))
+        board.make_move(parse_move("e5d6"))
+        self.assertIsNone(board.piece_at(parse_square("d5")))
+        board.unmake_move()
+        self.assertEqual(BLACK * 6 + PAWN, board.piece_at(parse_square("d5")))
+
+    def test_en_passant_horizontal_pin(self):
+        board = Board.from_fen("8/8/8/K2pP2r/8/8/8/4k3 w - d6 0 1")
+        self.assertNotIn("e5d6", self.names(board))
+
+    def test_promotion(self):
+        board = Board.from_fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        self.assertTrue({"b7b8q", "b7b8r", "b7b8b", "b7b8n"} <= self.names(board))
+        board.make_move(parse_move("b7b8n"))
+        self.assertEqual(WHITE * 6 + KNIGHT, board.piece_at(parse_square("b8")))
+        board.unmake_move()
+        self.assertEqual(WHITE * 6 + PAWN, board.piece_at(parse_square("b7")))
+
+
+class TestPositionEncoding(unittest.TestCase):
+    def test_fen_round_trip(self):
+        for _, fen, _ in STANDARD_POSITIONS:
+            self.assertEqual(fen, Board.from_fen(fen).to_fen())
+
+    def test_clocks_follow_moves_and_unmoves(self):
+        board = Board.from_fen(START_FEN)
+        for move in ["g1f3", "g8f6", "f3g1", "e7e5"]:
+            board.make_move(parse_move(move))
+        self.assertEqual("rnbqkb1r/pppp1ppp/5n2/4p3/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 3", board.to_fen())
+        board.unmake_move()
+        self.assertEqual((3, 2), (board.halfmove_clock, board.fullmove_number))
+        board.unmake_move()
+        self.assertEqual((2, 2), (board.halfmove_clock, board.fullmove_number))
+
+    def test_unusable_en_passant_square_is_dropped(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        self.assertIsNone(board.ep_square)
+        played = Board.from_fen(START_FEN)
+        played.make_move(parse_move("e2e4"))
+        self.assertEqual(played.zobrist_key, board.zobrist_key)
+
+    def test_castling_rights_need_king_and_rook_at_home(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/8/4K3 w K - 0 1")
+        self.assertEqual(0, board.castling)
+        self.assertEqual("4k3/8/8/8/8/8/8/4K3 w - - 0 1", board.to_fen())
+        self.assertNotIn(parse_move("e1g1"), board.generate_legal_moves())
+
+    def test_pack_round_trip(self):
+        rng = random.Random(3)
+        for _, fen, _ in STANDARD_POSITIONS:
+            board = Board.from_fen(fen)
+            for _ in range(30):
+                data = board.pack()
+                self.assertEqual(PACKED_SIZE, len(data))
+                unpacked = Board.unpack(data)
+                self.assertEqual(board.to_fen(), unpacked.to_fen())
+                self.assertEqual(board.zobrist_key, unpacked.zobrist_key)
+                self.assertEqual(board.attack_counts, unpacked.attack_counts)
+                moves = board.generate_legal_moves()
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+
+    def test_pack_keeps_en_passant_square(self):
+        board = Board.from_fen("8/8/8/8/4p3/8/3P4/K6k w - - 0 1")
+        board.make_move(parse_move("d2d4"))
+        self.assertEqual(parse_square("d3"), Board.unpack(board.pack()).ep_square)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import random
+import tempfile
+import numpy as np
+from src.board import Board
+from src.book import BookBuilder, OpeningBook, BOOK_RECORD_SIZE
+from src.move import move_name
+from src.selfplay import BookPolicy, RandomPolicy, play_game, run_self_play
+from game_params import START_FEN
+
+PGN = """[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 1-0
+
+[Result "1/2-1/2"]
+
+1. e4 c5 2. Nf3 1/2-1/2
+
+[Result "0-1"]
+
+1. d4 d5 2. c4 0-1
+
+[Result "*"]
+
+1. c4 *
+"""
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pgn_path = os.path.join(self.directory.name, "games.pgn")
+        with open(self.pgn_path, "w") as file:
+            file.write(PGN)
+        self.book_path = os.path.join(self.directory.name, "book.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_build_and_probe(self):
+        builder = BookBuilder(max_plies=4)
+        self.assertEqual(3, builder.add_pgn(self.pgn_path))
+        records = builder.write(self.book_path)
+        self.assertEqual(records * BOOK_RECORD_SIZE, os.path.getsize(self.book_path))
+        board = Board.from_fen(START_FEN)
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(records, len(book))
+            # e4 won once and drew once, d4 lost
+            self.assertEqual([("e2e4", 3)], [(move_name(move), weight) for move, weight in book.entries(board)])
+            board.make_move(book.choose(board))
+            # e5 only lost and is left out
+            self.assertEqual([("c7c5", 1)], [(move_name(move), weight) for move, weight in book.entries(board)])
+            board.make_move(board.generate_legal_moves()[0])
+            self.assertNotIn(board, book)
+            self.assertIsNone(book.choose(board))
+
+    def test_broken_games_are_not_counted(self):
+        with open(self.pgn_path, "w") as file:
+            file.write('[Result "1-0"]\n\n1. e4 e5 2. Ke3 Nc6 1-0\n\n'
+                       '[Result "1-0"]\n[FEN "garbage"]\n\n1. e4 1-0\n')
+        builder = BookBuilder()
+        self.assertEqual(0, builder.add_pgn(self.pgn_path))
+        self.assertEqual(0, builder.games)
+        self.assertEqual({}, dict(builder.weights))
+
+    def test_weighted_choice(self):
+        builder = BookBuilder()
+        key = Board.from_fen(START_FEN).zobrist_key
+        for move, wins in ((1, 3), (2, 1), (3, 0)):
+            for _ in range(wins):
+                builder.add(key, move, 1)
+        builder.add(key, 3, 0)
+        builder.write(self.book_path)
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual([(1, 6), (2, 2), (3, 1)], book.entries(key))
+            self.assertEqual(book.entries(key), book.entries(np.uint64(key)))
+            rng = random.Random(0)
+            choices = [book.choose(Board.from_fen(START_FEN), rng) for _ in range(900)]
+        self.assertGreater(choices.count(1), choices.count(2))
+        self.assertGreater(choices.count(2), choices.count(3))
+        self.assertGreater(choices.count(3), 0)
+
+    def test_empty_book(self):
+        self.assertEqual(0, BookBuilder().write(self.book_path))
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual([], book.entries(Board.from_fen(START_FEN)))
+
+    def test_self_play_book(self):
+        shards = os.path.join(self.directory.name, "shards")
+        run_self_play(4, shards, workers=1, max_plies=30, seed=1)
+        builder = BookBuilder(max_plies=6)
+        self.assertGreater(builder.add_dataset(shards), 0)
+        self.assertEqual(4, builder.games)
+        builder.write(self.book_path, min_weight=0)
+        with OpeningBook(self.book_path) as book:
+            self.assertGreater(len(book.entries(Board.from_fen(START_FEN))), 0)
+        records = play_game(BookPolicy(self.book_path, RandomPolicy()), random.Random(0), max_plies=10)
+        self.assertEqual(10, len(records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import numpy as np
+from src.dataset import RECORD_DTYPE, ShardWriter, ShardedDataset
+from src.features import PLANE_COUNT
+
+
+def make_records(count, start=0):
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["move"] = np.arange(start, start + count)
+    records["result"] = np.arange(start, start + count) % 3 - 1
+    # a lone white king on a1, so that the positions can be encoded
+    records["position"][:, 0] = 1
+    records["position"][:, 8] = 5
+    return records
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with ShardWriter(self.directory.name, records_per_shard=40) as writer:
+            writer.write(make_records(25))
+            writer.write(make_records(75, 25))
+        self.writer = writer
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shards_and_index(self):
+        self.assertEqual(3, len(self.writer.shards))
+        dataset = ShardedDataset(self.directory.name)
+        self.assertEqual(100, len(dataset))
+        self.assertEqual([40, 40, 20], [len(shard) for shard in dataset.shards])
+
+    def test_rewrite_ignores_old_shards(self):
+        with ShardWriter(self.directory.name, records_per_shard=40) as writer:
+            writer.write(make_records(5, 500))
+        dataset = ShardedDataset(self.directory.name)
+        self.assertEqual(5, len(dataset))
+        self.assertEqual(list(range(500, 505)), list(dataset.take(np.arange(5))["move"]))
+
+    def test_random_access(self):
+        dataset = ShardedDataset(self.directory.name)
+        self.assertEqual(0, dataset[0]["move"])
+        self.assertEqual(45, dataset[45]["move"])
+        self.assertEqual(99, dataset[-1]["move"])
+        indices = np.array([99, 3, 41, 40, 39])
+        self.assertEqual(list(indices), list(dataset.take(indices)["move"]))
+        self.assertEqual(list(indices), list(dataset[indices]["move"]))
+        self.assertEqual([99, 0], list(dataset.take([-1, -100])["move"]))
+        with self.assertRaises(IndexError):
+            dataset.take([100])
+        with self.assertRaises(IndexError):
+            dataset.take([-101])
+        self.assertEqual(16, len(dataset.sample(16, np.random.default_rng(0))))
+
+    def test_batches_in_order(self):
+        dataset = ShardedDataset(self.directory.name)
+        batches = list(dataset.batches(32))
+        self.assertEqual([32, 32, 32, 4], [len(batch) for batch in batches])
+        self.assertEqual(list(range(100)), list(np.concatenate(batches)["move"]))
+        self.assertEqual(3, len(list(dataset.batches(32, drop_last=True))))
+
+    def test_shuffled_batches_cover_dataset_once(self):
+        dataset = ShardedDataset(self.directory.name)
+        moves = np.concatenate([batch["move"] for batch in dataset.batches(16, shuffle_buffer=30, seed=1)])
+        self.assertEqual(list(range(100)), sorted(moves))
+        self.assertNotEqual(list(range(100)), list(moves))
+
+    def test_encoded_batches(self):
+        dataset = ShardedDataset(self.directory.name)
+        planes, moves, results = next(dataset.batches(8, encode=True))
+        self.assertEqual((8, PLANE_COUNT, 8, 8), planes.shape)
+        self.assertEqual(1, planes[0, 5, 0, 0])
+        self.assertEqual(list(range(8)), list(moves))
+        self.assertEqual(list(np.arange(8) % 3 - 1), list(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
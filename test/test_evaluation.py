@@ -0,0 +1,57 @@
+import unittest
+import random
+from src.board import Board
+from src.evaluation import evaluate, compute_scores
+from src.perft import STANDARD_POSITIONS
+from game_params import START_FEN
+
+
+class TestEvaluation(unittest.TestCase):
+    def test_incremental_scores_match_full_computation(self):
+        rng = random.Random(11)
+        for name, fen, _ in STANDARD_POSITIONS:
+            board = Board.from_fen(fen)
+            initial = compute_scores(board)
+            self.assertEqual(initial, (board.mg_score, board.eg_score, board.phase), name)
+            for _ in range(60):
+                moves = board.generate_legal_moves()
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+                self.assertEqual(compute_scores(board), (board.mg_score, board.eg_score, board.phase),
+                                 name)
+            while board.history:
+                board.unmake_move()
+            self.assertEqual(initial, (board.mg_score, board.eg_score, board.phase), name)
+
+    def test_start_position_is_balanced(self):
+        board = Board.from_fen(START_FEN)
+        self.assertEqual(0, evaluate(board))
+        self.assertEqual(24, board.phase)
+
+    def test_mirrored_positions_have_same_score(self):
+        white = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        black = Board.from_fen("r3k2r/pppbbppp/2n2q1P/1P2p3/3pn3/BN2PNP1/P1PPQPB1/R3K2R b KQkq - 0 1")
+        self.assertEqual(evaluate(white), evaluate(black))
+
+    def test_score_is_relative_to_side_to_move(self):
+        white_to_move = Board.from_fen("4k3/8/8/8/8/8/8/3QK3 w - - 0 1")
+        black_to_move = Board.from_fen("4k3/8/8/8/8/8/8/3QK3 b - - 0 1")
+        self.assertGreater(evaluate(white_to_move), 800)
+        self.assertEqual(-evaluate(white_to_move), evaluate(black_to_move))
+
+    def test_endgame_prefers_central_king(self):
+        central = Board.from_fen("8/8/8/4k3/8/8/P7/K7 b - - 0 1")
+        corner = Board.from_fen("7k/8/8/8/8/8/P7/K7 b - - 0 1")
+        self.assertGreater(evaluate(central), evaluate(corner))
+
+    def test_copy_keeps_scores(self):
+        board = Board.from_fen(START_FEN)
+        board.make_move(board.generate_legal_moves()[0])
+        copy = board.copy()
+        self.assertEqual((board.mg_score, board.eg_score, board.phase),
+                         (copy.mg_score, copy.eg_score, copy.phase))
+
+
+if __name__ == '__main__':
+    unittest.main()
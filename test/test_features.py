@@ -0,0 +1,54 @@
+import unittest
+import random
+import numpy as np
+from src.board import Board
+from src.bitboard import parse_square
+from src.features import encode_boards, encode_packed, PLANE_COUNT, SIDE_PLANE, CASTLING_PLANE, \
+    EP_PLANE
+from src.perft import STANDARD_POSITIONS
+from game_params import START_FEN, WHITE, BLACK, PAWN, KING
+
+
+class TestFeatures(unittest.TestCase):
+    def test_start_position(self):
+        planes = encode_boards([Board.from_fen(START_FEN)], dtype=np.uint8)
+        self.assertEqual((1, PLANE_COUNT, 8, 8), planes.shape)
+        self.assertEqual(np.uint8, planes.dtype)
+        self.assertEqual([1] * 8, list(planes[0, WHITE * 6 + PAWN, 1]))
+        self.assertEqual(1, planes[0, BLACK * 6 + KING, 7, 4])
+        self.assertEqual(32, planes[0, :12].sum())
+        self.assertEqual(0, planes[0, SIDE_PLANE].sum())
+        self.assertEqual(4 * 64, planes[0, CASTLING_PLANE:CASTLING_PLANE + 4].sum())
+
+    def test_flags(self):
+        board = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K2R w K d6 0 1")
+        board.make_move(board.generate_legal_moves()[0])
+        planes = encode_boards([Board.from_fen("4k3/8/8/3pP3/8/8/8/4K2R w K d6 0 1"), board])
+        square = parse_square("d6")
+        self.assertEqual(1.0, planes[0, EP_PLANE, square >> 3, square & 7])
+        self.assertEqual(1.0, planes[0, EP_PLANE].sum())
+        self.assertEqual(64, planes[0, CASTLING_PLANE].sum())
+        self.assertEqual(0, planes[0, CASTLING_PLANE + 1].sum())
+        self.assertEqual(64, planes[1, SIDE_PLANE].sum())
+
+    def test_packed_matches_boards(self):
+        rng = random.Random(5)
+        boards = []
+        for _, fen, _ in STANDARD_POSITIONS:
+            board = Board.from_fen(fen)
+            for _ in range(20):
+                boards.append(board.copy())
+                moves = board.generate_legal_moves()
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+        records = b"".join(board.pack() for board in boards)
+        np.testing.assert_array_equal(encode_boards(boards), encode_packed(records))
+
+    def test_empty_batch(self):
+        self.assertEqual((0, PLANE_COUNT, 8, 8), encode_boards([]).shape)
+        self.assertEqual((0, PLANE_COUNT, 8, 8), encode_packed(b"").shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
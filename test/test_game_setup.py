@@ -0,0 +1,52 @@
+import unittest
+from game_setup import create_figures, new_board
+from src.board import Board
+from src.move import parse_move
+from src.bitboard import parse_square
+
+
+class TestGameSetup(unittest.TestCase):
+    def test_create_figures_is_independent(self):
+        figures_1, figures_dict_1 = create_figures()
+        figures_2, figures_dict_2 = create_figures()
+        self.assertEqual(32, len(figures_1))
+        self.assertIsNot(figures_dict_1["wP5"], figures_dict_2["wP5"])
+        board_1 = Board(figures_1)
+        board_2 = Board(figures_2)
+        figures_dict_1["wP5"].move_to(board_1, "e4", "white")
+        figures_dict_1["bP4"].move_to(board_1, "d5", "black")
+        figures_dict_1["wP5"].move_to(board_1, "d5", "white")
+        self.assertEqual(31, len(board_1.figures))
+        self.assertEqual(32, len(board_2.figures))
+        self.assertEqual((1, 4), (figures_dict_2["wP5"].field_row, figures_dict_2["wP5"].field_col))
+
+    def test_new_board(self):
+        board_1 = new_board()
+        board_2 = new_board()
+        board_1.make_move(parse_move("e2e4"))
+        self.assertIsNone(board_2.piece_at(parse_square("e4")))
+        self.assertEqual(20, len(board_2.generate_legal_moves()))
+        board = new_board("4k3/8/8/8/8/8/8/4K3 b - - 0 1")
+        self.assertEqual("black", board.turn)
+
+    def test_copy_shares_no_state(self):
+        board = new_board()
+        board.make_move(parse_move("e2e4"))
+        clone = board.copy()
+        self.assertEqual(board.zobrist_key, clone.zobrist_key)
+        self.assertEqual(board.attack_counts, clone.attack_counts)
+        clone.make_move(parse_move("d7d5"))
+        clone.make_move(parse_move("e4d5"))
+        self.assertEqual(1, len(board.history))
+        self.assertIsNone(board.piece_at(parse_square("d5")))
+        self.assertEqual(32, len(board.figures))
+        self.assertEqual(31, len(clone.figures))
+        clone.unmake_move()
+        clone.unmake_move()
+        clone.unmake_move()
+        self.assertEqual(new_board().zobrist_key, clone.zobrist_key)
+        self.assertEqual(new_board().bitboards, clone.bitboards)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import numpy as np
+from src.board import Board
+from src.mcts import MCTS, EXPANDED
+from src.move import move_name
+from src.nn import ValueNetwork, BatchEvaluator
+from game_params import START_FEN
+
+SCHOLARS_MATE = "r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+
+def check_tree(test, tree):
+    """
+    checks the links and visit counts of every node reachable from the root
+    """
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if tree.state[node] != EXPANDED:
+            continue
+        start = int(tree.first_child[node])
+        end = start + int(tree.child_count[node])
+        test.assertLessEqual(end, tree.node_count)
+        test.assertTrue(np.all(tree.parent[start:end] == node))
+        test.assertLessEqual(int(tree.visits[start:end].sum()), int(tree.visits[node]))
+        stack.extend(range(start, end))
+
+
+class TestMCTS(unittest.TestCase):
+    def test_visit_counts(self):
+        tree = MCTS(Board.from_fen(START_FEN), batch_size=8)
+        tree.search(200)
+        moves, visits = tree.policy()
+        self.assertEqual(20, len(moves))
+        self.assertEqual(200, tree.visits[tree.root])
+        # the first batch only reaches the unexpanded root
+        self.assertEqual(192, visits.sum())
+        self.assertTrue(np.all(tree.visits[:tree.node_count] >= 0))
+        check_tree(self, tree)
+
+    def test_virtual_loss_spreads_batch(self):
+        tree = MCTS(Board.from_fen(START_FEN), batch_size=8)
+        tree.search(16)
+        _, visits = tree.policy()
+        self.assertEqual(8, np.count_nonzero(visits == 1))
+
+    def test_finds_mate(self):
+        tree = MCTS(Board.from_fen(SCHOLARS_MATE))
+        tree.search(400)
+        self.assertEqual("h5f7", move_name(tree.best_move()))
+
+    def test_no_moves(self):
+        tree = MCTS(Board.from_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1"))
+        tree.search(10)
+        self.assertIsNone(tree.best_move())
+        # every simulation is a loss for the side to move, a win for the side that moved
+        self.assertEqual(10, tree.value_sum[tree.root])
+
+    def test_advance_keeps_subtree(self):
+        tree = MCTS(Board.from_fen(START_FEN))
+        tree.search(300)
+        moves, visits = tree.policy()
+        move = moves[int(np.argmax(visits))]
+        nodes = tree.node_count
+        tree.advance(move)
+        self.assertEqual(visits.max(), tree.visits[tree.root])
+        self.assertEqual(nodes, tree.node_count)
+        self.assertEqual(1, tree.board.side)
+        tree.search(100)
+        self.assertEqual(visits.max() + 100, tree.visits[tree.root])
+        check_tree(self, tree)
+
+    def test_store_is_compacted(self):
+        tree = MCTS(Board.from_fen(START_FEN), capacity=1024, max_nodes=8192)
+        compactions = 0
+        for _ in range(6):
+            root = tree.root
+            tree.search(200)
+            compactions += root != 0 and tree.root == 0
+            visits = tree.visits[tree.root]
+            tree.advance(tree.best_move())
+            self.assertLessEqual(tree.capacity, 8192)
+            self.assertLess(tree.visits[tree.root], visits)
+            check_tree(self, tree)
+        self.assertGreater(compactions, 0)
+
+    def test_batched_network_values(self):
+        sizes = []
+        with BatchEvaluator(ValueNetwork(hidden=(16,))) as evaluator:
+            def value_fn(boards):
+                sizes.append(len(boards))
+                return evaluator.evaluate_many(boards)
+
+            tree = MCTS(Board.from_fen(START_FEN), value_fn, batch_size=16)
+            tree.search(160)
+        self.assertGreater(max(sizes), 8)
+        self.assertEqual(160, tree.visits[tree.root])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import tempfile
+import threading
+import numpy as np
+from src.board import Board
+from src.features import encode_boards
+from src.nn import ValueNetwork, BatchEvaluator
+from src.search import Searcher
+from game_params import START_FEN
+
+
+def positions():
+    board = Board.from_fen(START_FEN)
+    boards = []
+    for move in board.generate_legal_moves():
+        board.make_move(move)
+        boards.append(board.copy())
+        board.unmake_move()
+    return boards
+
+
+class TestValueNetwork(unittest.TestCase):
+    def test_values(self):
+        values = ValueNetwork(hidden=(16,))(encode_boards(positions()))
+        self.assertEqual((20,), values.shape)
+        self.assertTrue(np.all(np.abs(values) <= 1))
+
+    def test_save_and_load(self):
+        network = ValueNetwork(hidden=(16, 8), seed=3)
+        planes = encode_boards(positions())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "network.npz")
+            network.save(path)
+            np.testing.assert_array_equal(network(planes), ValueNetwork.load(path)(planes))
+
+
+class TestBatchEvaluator(unittest.TestCase):
+    def test_concurrent_requests_are_batched(self):
+        network = ValueNetwork(hidden=(16,))
+        boards = positions()
+        expected = network(encode_boards(boards))
+        results = [None] * len(boards)
+        with BatchEvaluator(network, max_batch_size=8, max_latency=0.05) as evaluator:
+            def request(index):
+                results[index] = evaluator.evaluate(boards[index])
+
+            threads = [threading.Thread(target=request, args=(index,)) for index in range(len(boards))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertLess(evaluator.batches, len(boards))
+            self.assertGreater(evaluator.mean_batch_size, 1)
+        np.testing.assert_allclose(expected, results, rtol=1e-5)
+
+    def test_cache(self):
+        network = ValueNetwork(hidden=(16,))
+        board = Board.from_fen(START_FEN)
+        with BatchEvaluator(network, max_latency=0.001) as evaluator:
+            first = evaluator.evaluate(board)
+            self.assertEqual(first, evaluator.evaluate(board))
+            self.assertEqual(1, evaluator.batches)
+            self.assertEqual(0.5, evaluator.hit_rate)
+
+    def test_submit_after_close(self):
+        evaluator = BatchEvaluator(ValueNetwork(hidden=(16,)))
+        evaluator.close()
+        with self.assertRaises(RuntimeError):
+            evaluator.evaluate(Board.from_fen(START_FEN))
+
+    def test_evaluate_many(self):
+        network = ValueNetwork(hidden=(16,))
+        boards = positions()
+        with BatchEvaluator(network, max_batch_size=6, cache_size=10) as evaluator:
+            values = evaluator.evaluate_many(boards)
+            self.assertEqual(4, evaluator.batches)
+            self.assertEqual(10, len(evaluator.cache))
+        np.testing.assert_allclose(network(encode_boards(boards)), values, rtol=1e-5)
+
+    def test_search_with_network(self):
+        network = ValueNetwork(hidden=(16,))
+        board = Board.from_fen(START_FEN)
+        with BatchEvaluator(network, max_latency=0) as evaluator:
+            result = Searcher(tt_size_mb=1, evaluator=evaluator.score).search(board, max_depth=2)
+        self.assertIn(result.move, board.generate_legal_moves())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from src.board import Board
+from src.parallel import ParallelSearcher
+from src.move import move_name
+from game_params import START_FEN
+
+
+class TestParallelSearch(unittest.TestCase):
+    def test_workers_share_table(self):
+        board = Board.from_fen(START_FEN)
+        with ParallelSearcher(workers=2, tt_size_mb=1) as searcher:
+            result = searcher.search(board, max_depth=3)
+            self.assertEqual(3, result.depth)
+            self.assertIn(result.move, board.generate_legal_moves())
+            self.assertGreater(searcher.hit_rate, 0)
+            result = searcher.search(board, max_depth=3)
+            self.assertEqual(3, result.depth)
+        self.assertEqual([], board.history)
+
+    def test_node_limit_below_workers(self):
+        board = Board.from_fen(START_FEN)
+        with ParallelSearcher(workers=3, tt_size_mb=1) as searcher:
+            result = searcher.search(board, max_depth=3, node_limit=2)
+        self.assertIn(result.move, board.generate_legal_moves())
+        self.assertLessEqual(result.nodes, 2)
+
+    def test_mate_in_one(self):
+        board = Board.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        with ParallelSearcher(workers=2, tt_size_mb=1) as searcher:
+            result = searcher.search(board, max_depth=3, time_limit=5)
+        self.assertEqual("a1a8", move_name(result.move))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from src.board import Board
+from src.pawns import pawn_structure, PawnCache, DOUBLED_PAWN, ISOLATED_PAWN, PASSED_PAWN_MG, \
+    PASSED_PAWN_EG, SHIELD_PAWN
+from src.move import parse_move
+from game_params import START_FEN
+
+
+class TestPawnStructure(unittest.TestCase):
+    def test_start_position_is_balanced(self):
+        self.assertEqual((0, 0), pawn_structure(Board.from_fen(START_FEN)))
+
+    def test_doubled_isolated_passed_pawns(self):
+        # white: doubled and isolated pawns on the e-file, only the e5 pawn is passed,
+        # the e2 pawn is blocked by its own pawn
+        board = Board.from_fen("k7/8/8/4P3/8/8/4P3/7K w - - 0 1")
+        mg, eg = pawn_structure(board)
+        self.assertEqual(DOUBLED_PAWN[0] + 2 * ISOLATED_PAWN[0] + PASSED_PAWN_MG[4], mg)
+        self.assertEqual(DOUBLED_PAWN[1] + 2 * ISOLATED_PAWN[1] + PASSED_PAWN_EG[4], eg)
+
+    def test_blocked_pawn_is_not_passed(self):
+        board = Board.from_fen("k7/8/3p4/8/4P3/8/8/7K w - - 0 1")
+        self.assertEqual((0, 0), pawn_structure(board))
+
+    def test_pawn_shield(self):
+        sheltered = Board.from_fen("k7/5ppp/8/8/8/8/5PPP/6K1 w - - 0 1")
+        bare = Board.from_fen("k7/5ppp/8/8/8/5PPP/8/6K1 w - - 0 1")
+        self.assertEqual(3 * SHIELD_PAWN[0] - 3 * SHIELD_PAWN[1],
+                         pawn_structure(sheltered)[0] - pawn_structure(bare)[0])
+
+
+class TestPawnCache(unittest.TestCase):
+    def test_hits_after_piece_moves(self):
+        board = Board.from_fen(START_FEN)
+        cache = PawnCache()
+        cache.scores(board)
+        board.make_move(parse_move("g1f3"))
+        self.assertEqual(pawn_structure(board), cache.scores(board))
+        self.assertEqual(0.5, cache.hit_rate)
+        board.make_move(parse_move("e7e5"))
+        cache.scores(board)
+        self.assertEqual(1, cache.hits)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PawnCache(capacity=2)
+        boards = [Board.from_fen(START_FEN) for _ in range(3)]
+        boards[1].make_move(parse_move("e2e4"))
+        boards[2].make_move(parse_move("d2d4"))
+        cache.scores(boards[0])
+        cache.scores(boards[1])
+        cache.scores(boards[0])
+        cache.scores(boards[2])
+        self.assertEqual(2, len(cache.entries))
+        self.assertIn(boards[0].pawn_key, cache.entries)
+        self.assertNotIn(boards[1].pawn_key, cache.entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from src.board import Board
+from src.perft import perft, divide, run_suite, STANDARD_POSITIONS
+from game_params import START_FEN
+
+
+class TestPerft(unittest.TestCase):
+    def test_standard_positions(self):
+        for result in run_suite(max_depth=3):
+            self.assertEqual(result["expected"], result["nodes"], result["name"])
+
+    def test_divide(self):
+        board = Board.from_fen(START_FEN)
+        counts = divide(board, 2)
+        self.assertEqual(20, len(counts))
+        self.assertEqual(20, counts["e2e4"])
+        self.assertEqual(400, sum(counts.values()))
+        self.assertEqual(20, sum(divide(board, 1).values()))
+        self.assertEqual({}, divide(board, 0))
+
+    def test_perft_restores_board(self):
+        name, fen, counts = STANDARD_POSITIONS[1]
+        board = Board.from_fen(fen)
+        bitboards = list(board.bitboards)
+        attack_counts = [counts[:] for counts in board.attack_counts]
+        self.assertEqual(counts[2], perft(board, 2))
+        self.assertEqual(bitboards, board.bitboards)
+        self.assertEqual(attack_counts, board.attack_counts)
+        self.assertEqual((15, None), (board.castling, board.ep_square))
+
+
+if __name__ == '__main__':
+    unittest.main()
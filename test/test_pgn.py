@@ -0,0 +1,86 @@
+import unittest
+import io
+import os
+import tempfile
+from src.pgn import read_games, read_pgn_file, parse_san, replay, PgnError
+from src.board import Board
+from src.move import move_name
+
+PGN = """[Event "Example"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 {a comment
+over two lines} e5 2. Nf3 Nc6 3. Bb5 a6 (3... Nf6 4. O-O (4. d3) Nxe4) 4. Ba4
+Nf6 5. O-O Be7 $1 6. Re1 b5 7. Bb3 d6 ; rest of the line
+8. c3 O-O 1-0
+
+[Event "Endgame"]
+[FEN "4k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 1"]
+%escaped line
+1.exd6 Kd7 2.b8=N+ Kxd6 3.Kd2
+
+[Event "Unfinished"]
+1. d4 d5 *
+"""
+
+
+class TestPgn(unittest.TestCase):
+    def test_read_games(self):
+        games = list(read_games(io.StringIO(PGN)))
+        self.assertEqual(["Example", "Endgame", "Unfinished"], [game.headers["Event"] for game in games])
+        self.assertEqual(["1-0", "*", "*"], [game.result for game in games])
+        self.assertEqual(["e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4", "Nf6", "O-O", "Be7", "Re1",
+                          "b5", "Bb3", "d6", "c3", "O-O"], games[0].moves)
+        self.assertEqual(["exd6", "Kd7", "b8=N+", "Kxd6", "Kd2"], games[1].moves)
+
+    def test_read_pgn_file_with_byte_order_mark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.pgn")
+            with open(path, "w", encoding="utf-8-sig") as file:
+                file.write(PGN)
+            games = list(read_pgn_file(path))
+        self.assertEqual(["Example", "Endgame", "Unfinished"], [game.headers["Event"] for game in games])
+        self.assertEqual("e4", games[0].moves[0])
+
+    def test_replay(self):
+        games = list(read_games(io.StringIO(PGN)))
+        moves = [move_name(move) for _, move in replay(games[0])]
+        self.assertEqual("e1g1", moves[8])
+        self.assertEqual("e8g8", moves[15])
+        moves = [move_name(move) for _, move in replay(games[1])]
+        self.assertEqual(["e5d6", "e8d7", "b7b8n", "d7d6", "e1d2"], moves)
+
+    def test_castling_with_zeros(self):
+        text = "1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4.0-0 Nf6 5 d3 0-0 1-0"
+        game = next(read_games(io.StringIO(text)))
+        self.assertEqual(["e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5", "0-0", "Nf6", "d3", "0-0"], game.moves)
+        moves = [move_name(move) for _, move in replay(game)]
+        self.assertEqual(["e1g1", "e8g8"], [moves[6], moves[9]])
+
+    def test_replay_yields_position_before_move(self):
+        game = next(read_games(io.StringIO(PGN)))
+        board, move = next(replay(game))
+        self.assertEqual("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", board.to_fen())
+        self.assertEqual("e2e4", move_name(move))
+
+    def test_disambiguation(self):
+        board = Board.from_fen("k7/8/8/8/8/8/8/R5RK w - - 0 1")
+        self.assertEqual("a1b1", move_name(parse_san(board, "Rab1")))
+        self.assertEqual("g1b1", move_name(parse_san(board, "Rgb1")))
+        with self.assertRaises(PgnError):
+            parse_san(board, "Rb1")
+
+    def test_illegal_move(self):
+        board = Board.from_fen("k7/8/8/8/8/8/8/R5RK w - - 0 1")
+        with self.assertRaises(PgnError):
+            parse_san(board, "Ra9")
+        with self.assertRaises(PgnError):
+            parse_san(board, "O-O")
+        with self.assertRaises(PgnError):
+            parse_san(board, "Nf3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import time
+from unittest import mock
+from src.board import Board
+from src.search import search, Searcher, MATE_SCORE
+from src.move import move_name, parse_move
+from game_params import START_FEN
+
+
+class TestSearch(unittest.TestCase):
+    def test_mate_in_one(self):
+        board = Board.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        result = search(board, max_depth=3)
+        self.assertEqual("a1a8", move_name(result.move))
+        self.assertEqual(MATE_SCORE - 1, result.score)
+        self.assertEqual(["a1a8"], [move_name(move) for move in result.pv])
+
+    def test_wins_hanging_queen(self):
+        board = Board.from_fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+        result = search(board, max_depth=2)
+        self.assertEqual("d2d5", move_name(result.move))
+        self.assertGreater(result.score, 0)
+
+    def test_hard_deadline(self):
+        board = Board.from_fen(START_FEN)
+        start = time.perf_counter()
+        result = search(board, time_limit=0.3)
+        self.assertLess(time.perf_counter() - start, 0.45)
+        self.assertIsNotNone(result.move)
+        self.assertEqual([], board.history)
+        self.assertEqual(Board.from_fen(START_FEN).zobrist_key, board.zobrist_key)
+
+    def test_time_limit_with_large_clock(self):
+        # perf_counter counts from boot on Linux, deadlines must not be compared with scores
+        clock = time.perf_counter
+        board = Board.from_fen(START_FEN)
+        with mock.patch("src.search.time.perf_counter", lambda: clock() + 2e6):
+            result = search(board, max_depth=3, time_limit=30)
+        self.assertEqual(3, result.depth)
+
+    def test_node_limit(self):
+        board = Board.from_fen(START_FEN)
+        searcher = Searcher()
+        result = searcher.search(board, node_limit=2000)
+        self.assertLessEqual(result.nodes, 2000)
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertIn(result.move, board.generate_legal_moves())
+
+    def test_quiescence_avoids_defended_pawn(self):
+        board = Board.from_fen("4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1")
+        result = search(board, max_depth=1)
+        self.assertNotEqual("d1d5", move_name(result.move))
+        self.assertGreater(result.score, 0)
+
+    def test_stalemate_scores_zero(self):
+        board = Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+        result = search(board, max_depth=2)
+        self.assertIsNone(result.move)
+        self.assertEqual(0, result.score)
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def test_captures_by_mvv_lva(self):
+        board = Board.from_fen("4k3/3r4/2q5/1P2N3/8/8/8/4K3 w - - 0 1")
+        searcher = Searcher(tt_size_mb=1)
+        moves = searcher._order(board, board.generate_legal_moves(), 0, 0)
+        self.assertEqual(["b5c6", "e5c6", "e5d7"], [move_name(move) for move in moves[:3]])
+
+    def test_hash_move_killers_and_history(self):
+        board = Board.from_fen(START_FEN)
+        searcher = Searcher(tt_size_mb=1)
+        searcher.killers[3] = [parse_move("b1c3"), parse_move("g1f3")]
+        searcher.history[board.squares[parse_move("e2e4") & 63]][parse_move("e2e4") >> 6] = 50
+        moves = searcher._order(board, board.generate_legal_moves(), 3, parse_move("a2a3"))
+        self.assertEqual(["a2a3", "b1c3", "g1f3", "e2e4"], [move_name(move) for move in moves[:4]])
+
+    def test_ordering_reduces_nodes(self):
+        class UnorderedSearcher(Searcher):
+            def _order(self, board, moves, ply, hash_move):
+                return moves
+
+        board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        ordered = Searcher(tt_size_mb=1).search(board, max_depth=3)
+        unordered = UnorderedSearcher(tt_size_mb=1).search(board, max_depth=3)
+        self.assertLess(2 * ordered.nodes, unordered.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from src.board import Board
+from src.see import see
+from src.move import parse_move
+
+
+class TestStaticExchange(unittest.TestCase):
+    def assertSee(self, expected, fen, move):
+        self.assertEqual(expected, see(Board.from_fen(fen), parse_move(move)))
+
+    def test_undefended_piece(self):
+        self.assertSee(250, "4k3/8/8/3n4/4P3/8/8/4K3 w - - 0 1", "e4d5")
+
+    def test_defended_pawn_costs_the_queen(self):
+        self.assertSee(100 - 900, "4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1", "d1d5")
+
+    def test_equal_trade(self):
+        self.assertSee(0, "4k3/8/4p3/3n4/8/4N3/8/4K3 w - - 0 1", "e3d5")
+
+    def test_x_ray_behind_rook(self):
+        # the second white rook recaptures through the first one
+        self.assertSee(100, "3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", "d2d5")
+        self.assertSee(100 - 500, "3rk3/3r4/8/3p4/8/8/8/3RK3 w - - 0 1", "d1d5")
+
+    def test_king_does_not_capture_into_attack(self):
+        self.assertSee(100 - 500, "4k3/3p4/8/8/8/8/3R4/4K3 w - - 0 1", "d2d7")
+        self.assertSee(100, "4k3/3p4/8/8/8/8/3R4/3RK3 w - - 0 1", "d2d7")
+
+    def test_en_passant_and_promotion(self):
+        self.assertSee(100, "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6")
+        self.assertSee(800, "4k3/1P6/8/8/8/8/8/4K3 w - - 0 1", "b7b8q")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import random
+import tempfile
+import os
+import numpy as np
+from src.board import Board
+from src.dataset import RECORD_DTYPE, RECORD_SIZE
+from src.features import PIECE_PLANES
+from src.move import move_name
+from src.selfplay import RandomPolicy, SearchPolicy, MCTSPolicy, ModelPolicy, game_result, \
+    play_game, run_self_play
+
+
+def material(planes):
+    """
+    material balance for the side to move, a picklable model for ModelPolicy
+    """
+    values = np.array([1, 3, 3, 5, 9, 0] * 2, dtype=np.float32)
+    values[6:] *= -1
+    scores = (planes[:, :PIECE_PLANES].sum(axis=(2, 3)) * values).sum(axis=1)
+    return np.where(planes[:, 12, 0, 0] == 1, -scores, scores)
+
+
+class TestSelfPlay(unittest.TestCase):
+    def test_game_result(self):
+        mated = Board.from_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1")
+        self.assertEqual(1, game_result(mated, mated.generate_legal_moves()))
+        stalemate = Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+        self.assertEqual(0, game_result(stalemate, stalemate.generate_legal_moves()))
+        bare_kings = Board.from_fen("7k/8/6K1/8/8/8/8/8 w - - 0 1")
+        self.assertEqual(0, game_result(bare_kings, bare_kings.generate_legal_moves()))
+        start = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        self.assertIsNone(game_result(start, start.generate_legal_moves()))
+
+    def test_play_game_records(self):
+        records = play_game(RandomPolicy(), random.Random(2), max_plies=60)
+        self.assertEqual(RECORD_DTYPE, records.dtype)
+        self.assertGreater(len(records), 0)
+        self.assertLessEqual(len(records), 60)
+        for record in records:
+            board = Board.unpack(record["position"].tobytes())
+            self.assertIn(int(record["move"]), board.generate_legal_moves())
+        # the results alternate with the side to move
+        self.assertTrue(np.all(records["result"][1:] == -records["result"][:-1]))
+
+    def test_search_policy_finds_mate(self):
+        board = Board.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        move = SearchPolicy(max_depth=2)(board, board.generate_legal_moves(), random.Random(0))
+        self.assertEqual("a1a8", move_name(move))
+
+    def test_mcts_policy_reuses_tree(self):
+        policy = MCTSPolicy(simulations=32)
+        records = play_game(policy, random.Random(0), max_plies=6)
+        self.assertEqual(6, len(records))
+        # the root keeps the visits of the earlier searches below the last move
+        self.assertGreater(policy._tree.visits[policy._tree.root], 0)
+        self.assertEqual(6, len(policy._tree.board.history))
+
+    def test_model_policy_takes_queen(self):
+        board = Board.from_fen("4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1")
+        move = ModelPolicy(material)(board, board.generate_legal_moves(), random.Random(0))
+        self.assertEqual("d1d5", move_name(move))
+
+    def test_run_self_play_writes_shards(self):
+        with tempfile.TemporaryDirectory() as directory:
+            stats = run_self_play(6, directory, workers=2, queue_size=2, records_per_shard=100,
+                                  max_plies=80)
+            self.assertEqual(6, stats["games"])
+            self.assertEqual(2, len(stats["worker_games_per_second"]))
+            sizes = [os.path.getsize(path) for path in stats["shards"]]
+            self.assertEqual(stats["positions"] * RECORD_SIZE, sum(sizes))
+            self.assertTrue(all(size <= 100 * RECORD_SIZE for size in sizes))
+
+
+if __name__ == '__main__':
+    unittest.main()
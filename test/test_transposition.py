@@ -0,0 +1,54 @@
+import unittest
+from src.transposition import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+from src.board import Board
+from src.search import Searcher
+from game_params import START_FEN
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.tt = TranspositionTable(1)
+
+    def test_size_is_capped(self):
+        self.assertEqual(1024 * 1024, self.tt.size_bytes)
+        self.assertEqual(1024 * 1024, len(self.tt.buffer))
+        for key in range(1, 100000, 7):
+            self.tt.store(key * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF, 0, 1, BOUND_EXACT, 0)
+        self.assertEqual(1024 * 1024, len(self.tt.buffer))
+
+    def test_fractional_size(self):
+        self.assertEqual(512 * 1024, TranspositionTable(0.5).size_bytes)
+
+    def test_store_and_probe(self):
+        key = 0xDEADBEEFCAFEBABE
+        self.assertIsNone(self.tt.probe(key))
+        self.tt.store(key, 1234, 7, BOUND_LOWER, -2500)
+        self.assertEqual((1234, 7, BOUND_LOWER, -2500), self.tt.probe(key))
+        self.assertEqual(0.5, self.tt.hit_rate)
+
+    def test_depth_preferred_and_always_replace(self):
+        mask = self.tt.mask
+        deep, shallow, newer = 5, 5 + (mask + 1), 5 + 2 * (mask + 1)
+        self.tt.store(deep, 1, 10, BOUND_EXACT, 0)
+        self.tt.store(shallow, 2, 2, BOUND_UPPER, 0)
+        self.tt.store(newer, 3, 3, BOUND_UPPER, 0)
+        self.assertEqual(1, self.tt.probe(deep)[0])
+        self.assertIsNone(self.tt.probe(shallow))
+        self.assertEqual(3, self.tt.probe(newer)[0])
+        # entries of an older search can be replaced by any depth
+        self.tt.new_search()
+        self.tt.store(shallow, 2, 1, BOUND_UPPER, 0)
+        self.assertEqual(2, self.tt.probe(shallow)[0])
+        self.assertEqual(1, self.tt.probe(deep)[0])
+
+    def test_search_uses_table(self):
+        searcher = Searcher(tt_size_mb=1)
+        searcher.search(Board.from_fen(START_FEN), max_depth=3)
+        stats = searcher.tt.stats()
+        self.assertGreater(stats["stores"], 0)
+        self.assertGreater(stats["hit_rate"], 0)
+        self.assertGreater(stats["usage"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
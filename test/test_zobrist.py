@@ -0,0 +1,73 @@
+import unittest
+import random
+from src.board import Board
+from src.move import parse_move
+from src.perft import STANDARD_POSITIONS
+from src.zobrist import compute_key, compute_pawn_key
+from game_params import START_FEN
+
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental_key_matches_full_computation(self):
+        rng = random.Random(7)
+        for name, fen, counts in STANDARD_POSITIONS:
+            board = Board.from_fen(fen)
+            keys = [board.zobrist_key]
+            for _ in range(40):
+                moves = board.generate_legal_moves()
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+                self.assertEqual(compute_key(board), board.zobrist_key, name)
+                self.assertEqual(compute_pawn_key(board), board.pawn_key, name)
+                keys.append(board.zobrist_key)
+            while board.history:
+                keys.pop()
+                board.unmake_move()
+                self.assertEqual(keys[-1], board.zobrist_key, name)
+
+    def test_transposition_has_same_key(self):
+        board_1 = Board.from_fen(START_FEN)
+        board_2 = Board.from_fen(START_FEN)
+        for move in ["g1f3", "g8f6", "b1c3"]:
+            board_1.make_move(parse_move(move))
+        for move in ["b1c3", "g8f6", "g1f3"]:
+            board_2.make_move(parse_move(move))
+        self.assertEqual(board_1.zobrist_key, board_2.zobrist_key)
+
+    def test_side_to_move_and_en_passant_change_key(self):
+        white = Board.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1")
+        black = Board.from_fen("4k3/8/8/8/8/8/8/4K3 b - - 0 1")
+        self.assertNotEqual(white.zobrist_key, black.zobrist_key)
+        ep = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        no_ep = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 w - - 0 1")
+        self.assertNotEqual(ep.zobrist_key, no_ep.zobrist_key)
+
+    def test_pawn_key_ignores_pieces(self):
+        board = Board.from_fen(START_FEN)
+        pawn_key = board.pawn_key
+        board.make_move(parse_move("g1f3"))
+        self.assertEqual(pawn_key, board.pawn_key)
+        board.make_move(parse_move("e7e5"))
+        self.assertNotEqual(pawn_key, board.pawn_key)
+
+    def test_repetition_count(self):
+        board = Board.from_fen(START_FEN)
+        for move in ["g1f3", "g8f6", "f3g1", "f6g8"] * 2:
+            board.make_move(parse_move(move))
+        self.assertEqual(2, board.repetition_count())
+        board.make_move(parse_move("e2e4"))
+        self.assertEqual(0, board.repetition_count())
+
+    def test_repetition_count_stops_at_halfmove_clock(self):
+        board = Board.from_fen(START_FEN)
+        for move in ["g1f3", "g8f6", "f3g1", "f6g8"] * 2:
+            board.make_move(parse_move(move))
+        self.assertEqual(8, board.halfmove_clock)
+        # only the plies since the last capture or pawn move are searched
+        board.halfmove_clock = 4
+        self.assertEqual(1, board.repetition_count())
+
+
+if __name__ == '__main__':
+    unittest.main()